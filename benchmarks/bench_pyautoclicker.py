@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks for PyAutoClicker.
+
+Runs on a box with no display: clicks go to FakeBackend and Tk is replaced by a tiny stub
+wherever a root/tree is needed. Results are written as JSON so runs can be compared:
+
+    python benchmarks/bench_pyautoclicker.py --out before.json
+    python benchmarks/bench_pyautoclicker.py --out after.json --compare before.json
+
+Covers: cold start (import time, time to hotkeys ready), achieved vs requested CPS and
+interval error of the click engine, engine thread vs engine process under GIL load,
+multi-sequence budget split, hotkey press->action latency
+with a busy Tk loop, cursor-glide path building/caching, sequence optimizer (dedupe + tour), motion capture at 1 kHz,
+sequence load/save/open/stream (JSON and .pacseq), library validate/pack/unpack/convert, Sequences Manager refresh/search/live updates, and
+dry-run scheduling overhead.
+Use --quick for a smoke run.
+"""
+import os, sys, json, time, heapq, argparse, platform, tempfile, shutil, subprocess, threading
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import pyautoclicker as pac  # noqa: E402  (no side effects; GUI/input modules load lazily)
+
+
+# ---------- helpers ----------
+def pct(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+def ms(ns): return round(ns / 1e6, 4)
+
+class StubRoot:
+    """Tk root stand-in: after() either drops the callback (worker UI refreshes) or queues it
+       for run() when the caller needs an event loop (dry-run engine)."""
+    def __init__(self):
+        self.q = []; self.n = 0
+    def after(self, delay_ms, fn=None, *args):
+        if fn is None: return None
+        self.n += 1
+        heapq.heappush(self.q, (time.perf_counter() + delay_ms / 1000.0, self.n, fn, args))
+        return self.n
+    def after_cancel(self, _id): pass
+    def run(self):
+        while self.q:
+            t, _, fn, args = heapq.heappop(self.q)
+            d = t - time.perf_counter()
+            if d > 0: time.sleep(d)
+            fn(*args)
+
+class StubTree:
+    def __init__(self): self.rows = {}
+    def get_children(self, *_): return tuple(self.rows)
+    def delete(self, *iids):
+        for i in iids: self.rows.pop(i, None)
+    def insert(self, _parent, _where, iid=None, values=()):
+        self.rows[iid] = values
+        return iid
+
+# ---------- benchmarks ----------
+HEAVY_MODULES = ("tkinter", "pynput", "pystray", "PIL", "numpy")
+
+# Runs in a fresh interpreter inside an empty scratch dir; prints one JSON line.
+_STARTUP_PROBE = r'''
+import os, sys, time, json
+t0 = time.perf_counter()
+sys.argv[0] = os.path.join(os.getcwd(), "pyautoclicker.py")
+sys.path.insert(0, %(root)r)
+import pyautoclicker as pac
+import_ms = (time.perf_counter() - t0) * 1000.0
+loaded = sorted(m for m in %(heavy)r if m in sys.modules)
+created = sorted(os.listdir("."))
+class Root:
+    def after(self, ms, fn=None, *a): return None
+    def withdraw(self): pass
+app = pac.App(Root(), backend=pac.FakeBackend())
+print(json.dumps({"import_ms": import_ms, "heavy_loaded_on_import": loaded, "files_created_on_import": created,
+                  "hotkeys_ready_ms": app.startup_ms, "hotkeys": len(app.input.hotkey_combos)}))
+'''
+
+def bench_startup(runs):
+    out = []
+    code = _STARTUP_PROBE % {"root": ROOT, "heavy": HEAVY_MODULES}
+    for _ in range(runs):
+        d = tempfile.mkdtemp(prefix="pac-bench-start-")
+        try:
+            t0 = time.perf_counter()
+            r = subprocess.run([sys.executable, "-c", code], cwd=d, capture_output=True, text=True, check=True)
+            wall = (time.perf_counter() - t0) * 1000.0
+            out.append(dict(json.loads(r.stdout.strip().splitlines()[-1]), process_ms=wall))
+        finally:
+            shutil.rmtree(d, ignore_errors=True)
+    hk = sorted(r["hotkeys_ready_ms"] for r in out)
+    imp = sorted(r["import_ms"] for r in out)
+    return {"runs": runs, "budget_ms": pac.STARTUP_BUDGET_MS,
+            "import_ms": {"p50": round(pct(imp, .5), 2), "max": round(imp[-1], 2)},
+            "hotkeys_ready_ms": {"p50": round(pct(hk, .5), 2), "max": round(hk[-1], 2)},
+            "process_ms_p50": round(pct(sorted(r["process_ms"] for r in out), .5), 2),
+            "within_budget": hk[-1] <= pac.STARTUP_BUDGET_MS,
+            "heavy_loaded_on_import": out[-1]["heavy_loaded_on_import"],
+            "files_created_on_import": out[-1]["files_created_on_import"]}
+
+def bench_click_engine(cps_list, seconds):
+    out = []
+    for cps in cps_list:
+        n = max(20, int(cps * seconds))
+        interval_ms = 1000.0 / cps
+        s = pac.Settings(max_cps=cps)
+        s.current_seq = [pac.Step(x=i % 50, y=i % 50, delay_ms=int(round(interval_ms))) for i in range(n)]
+        s.current_meta = pac.SequenceMeta(repeats=1)
+        backend = pac.FakeBackend()
+        eng = pac.ClickEngine(s, backend)
+        t0 = time.perf_counter_ns()
+        eng.run(s.current_seq, s.current_meta)
+        wall = time.perf_counter_ns() - t0
+        ts = backend.click_times_ns()
+        req_ns = int(round(interval_ms)) * 1_000_000
+        errs = sorted(abs((b - a) - req_ns) for a, b in zip(ts, ts[1:]))
+        span = (ts[-1] - ts[0]) / 1e9 if len(ts) > 1 else 0
+        sched = eng.scheduler
+        out.append({
+            "requested_cps": cps, "clicks": len(ts),
+            "achieved_cps": round((len(ts) - 1) / span, 3) if span else 0.0,
+            "expected_s": round((n * req_ns) / 1e9, 4), "wall_s": round(wall / 1e9, 4),
+            "interval_err_ms": {"p50": ms(pct(errs, .5)), "p99": ms(pct(errs, .99)), "max": ms(errs[-1] if errs else 0)},
+            "deadline_late_ms": {"avg": ms(sched.total_late_ns / max(1, sched.clicks)), "max": ms(sched.max_late_ns)},
+            "deadline_misses": eng.metrics.misses,
+        })
+    return out
+
+def bench_engine_isolation(cps, seconds, hog_threads=2):
+    """Click lateness at `cps` while busy pure-Python threads (a stand-in for UI work) hold the
+       GIL: the engine on a thread of this process vs in an EngineProcess."""
+    s = pac.Settings(max_cps=max(cps, 1))
+    steps = [pac.Step(x=i, y=0, delay_ms=int(1000 / cps)) for i in range(10)]
+    meta = pac.SequenceMeta(repeats=0)
+    def hog(stop):
+        while not stop.is_set(): sum(i * i for i in range(2000))
+    out = {"cps": cps, "hog_threads": hog_threads}
+    for mode in ("thread", "process"):
+        stop = threading.Event()
+        hogs = [threading.Thread(target=hog, args=(stop,), daemon=True) for _ in range(hog_threads)]
+        if mode == "thread":
+            eng = pac.ClickEngine(s, pac.FakeBackend())
+            threading.Timer(seconds, eng.control.stop).start()
+            for h in hogs: h.start()
+            eng.run(steps, meta); m = eng.metrics
+        else:
+            proc = pac.EngineProcess("fake")
+            ctl = pac.ProcessRunControl(proc)
+            proc.run(s, [("warmup", pac.SequenceMeta(repeats=1), steps[:1])])   # child imported and ready
+            for h in hogs: h.start()
+            threading.Timer(seconds, ctl.stop).start()
+            proc.run(s, [("bench", meta, steps)])
+            _, m = proc.read(); proc.close()
+        stop.set()
+        for h in hogs: h.join()
+        out[mode] = {"clicks": m.clicks, "achieved_cps": round(m.cps(), 2), "late_p99_ms": m.late_percentile_ms(0.99),
+                     "late_max_ms": ms(m.late_max_ns), "misses": m.misses}
+    return out
+
+def bench_multi(track_counts, max_cps, seconds):
+    """N tracks that each ask for max_cps on their own: checks the budget split and lateness."""
+    out = []
+    for n in track_counts:
+        s = pac.Settings(max_cps=max_cps)
+        backend = pac.FakeBackend()
+        eng = pac.MultiEngine(s, backend)
+        for i in range(n): eng.add(f"t{i}", [pac.Step(x=i, y=i, delay_ms=0)])
+        threading.Timer(seconds, eng.control.stop).start()
+        eng.run()
+        ts = backend.click_times_ns()
+        gaps = sorted(b - a for a, b in zip(ts, ts[1:]))
+        clicks = [tr.clicks for tr in eng.tracks]
+        sched = eng.scheduler
+        out.append({"tracks": n, "max_cps": max_cps, "achieved_cps": round(eng.metrics.cps(), 3),
+                    "per_track_clicks": {"min": min(clicks), "max": max(clicks)},
+                    "min_gap_ms": ms(gaps[0]) if gaps else 0,
+                    "deadline_late_ms": {"avg": ms(sched.total_late_ns / max(1, sched.clicks)), "max": ms(sched.max_late_ns)}})
+    return out
+
+def bench_hotkeys(presses, busy_ms):
+    """Pause/resume presses while the 'Tk loop' is busy in busy_ms chunks: the direct path
+       (RunControl from the listener thread) vs the queued Tk follow-up."""
+    import queue
+    tkq = queue.Queue()
+    def tk_loop():
+        while True:
+            fn = tkq.get()
+            if fn is None: return
+            fn(); time.sleep(busy_ms / 1000.0)   # the UI doing other work between callbacks
+    def churn():
+        while not stop.is_set(): tkq.put(lambda: None); time.sleep(busy_ms / 2000.0)
+    stop = threading.Event()
+    threads = [threading.Thread(target=tk_loop, daemon=True), threading.Thread(target=churn, daemon=True)]
+    for t in threads: t.start()
+    disp = pac.HotkeyDispatcher(lambda _ms, fn: tkq.put(fn))
+    ctl = pac.RunControl()
+    def direct():
+        ctl.set_paused(not ctl.paused); return lambda: None
+    fire = disp.bind("pause", lambda: None, direct)
+    for _ in range(presses):
+        fire(); time.sleep(0.01)
+    time.sleep(busy_ms * 4 / 1000.0)
+    stop.set(); tkq.put(None)
+    st = disp.stats()
+    return {"busy_ms": busy_ms, "presses": presses, "direct": st.get("pause"), "via_tk": st.get("pause (ui)")}
+
+def bench_library(n_files, steps_per_file, work):
+    """Whole-folder ops, inline (jobs=1) vs the process pool; files/s as reported by the ops."""
+    src = os.path.join(work, "lib"); os.makedirs(src, exist_ok=True)
+    steps = [pac.Step(x=i % 1920, y=i % 1080, delay_ms=20) for i in range(steps_per_file)]
+    for i in range(n_files):
+        pac.save_sequence_file(os.path.join(src, f"s{i:05d}" + (".pacseq" if i % 2 else ".json")), pac.SequenceMeta(name=f"s{i}"), steps)
+    out = {"files": n_files, "steps_per_file": steps_per_file, "cpus": os.cpu_count()}
+    for label, jobs in (("inline", 1), ("pool", None)):
+        d, conv = os.path.join(work, f"lib-{label}"), os.path.join(work, f"conv-{label}")
+        os.makedirs(d); os.makedirs(conv)
+        arc = os.path.join(work, f"lib-{label}.zip")
+        ops = {"validate": pac.validate_library(pac.library_files(src), jobs),
+               "pack": pac.pack_library(src, arc, jobs),
+               "unpack": pac.unpack_library(arc, d, jobs),
+               "convert": pac.convert_library(src, "pacseq", conv, jobs)}
+        out[label] = {k: {"files_per_s": r["files_per_s"], "ok": r["ok"]} for k, r in ops.items()}
+    return out
+
+def bench_optimizer(sizes):
+    """Random click targets on a 1080p screen (plus 5% repeats): dedupe + nearest-neighbour/2-opt."""
+    import random
+    rnd = random.Random(7)
+    out = []
+    for n in sizes:
+        steps = []
+        for _ in range(n):
+            if steps and rnd.random() < 0.05: steps.append(pac.Step(x=steps[-1].x, y=steps[-1].y, delay_ms=50))
+            else: steps.append(pac.Step(x=rnd.randrange(1920), y=rnd.randrange(1080), delay_ms=50))
+        steps += [pac.Step(x=steps[-1].x, y=steps[-1].y, delay_ms=50)] * 2   # a trailing run of repeats too
+        deduped = pac.dedupe_steps(steps)
+        assert sum(st.delay_ms for st in deduped) == sum(st.delay_ms for st in steps), "dedupe changed the pass length"
+        _, r = pac.optimize_sequence(steps, 0, True)
+        out.append(r)
+    return out
+
+def bench_trajectories(n_steps, move_ms=120, rate_hz=125):
+    """Glide paths for an n-step plan: batch build (cold), cached lookups (a repeat pass), and a
+       short gliding run's click lateness."""
+    out = {"steps": n_steps, "move_ms": move_ms, "rate_hz": rate_hz}
+    pts = [((i * 37) % 1900, (i * 91) % 1000) for i in range(n_steps)]
+    for curve in ("minjerk", "bezier"):
+        tc = pac.TrajectoryCache(rate_hz)
+        keys = [(*a, *b, move_ms, curve) for a, b in zip(pts, pts[1:])]
+        t0 = time.perf_counter(); tc.warm(keys); t_warm = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for k in keys: tc.path(*k)
+        t_hit = time.perf_counter() - t0
+        out[curve] = {"warm_ms": round(t_warm * 1000, 3), "per_path_hit_us": round(t_hit / len(keys) * 1e6, 3),
+                      "points_per_path": tc.points(move_ms)}
+    s = pac.Settings(max_cps=100, move_style="bezier", move_ms=40, move_rate_hz=rate_hz)
+    backend = pac.FakeBackend()
+    eng = pac.ClickEngine(s, backend)
+    steps = [pac.Step(x=x, y=y, delay_ms=50) for x, y in pts[:20]]
+    eng.run(steps, pac.SequenceMeta(repeats=2))
+    sched = eng.scheduler
+    out["gliding_run"] = {"clicks": sched.clicks, "moves": sum(1 for e in backend.events if e[1] == "move"),
+                          "cache_hits": eng.trajectories.hits, "cache_misses": eng.trajectories.misses,
+                          "deadline_late_ms": {"avg": ms(sched.total_late_ns / max(1, sched.clicks)), "max": ms(sched.max_late_ns)}}
+    return out
+
+def bench_motion_capture(rate_hz, seconds, tolerance_px=2):
+    """Recorder motion mode fed at rate_hz through FakeBackend: per-event capture cost, the CPU
+       share that implies at the input rate, and RDP simplification time/ratio on finish."""
+    import math
+    backend = pac.FakeBackend()
+    rec = pac.MotionRecorder(1 << 20)
+    h = backend.listen(on_move=lambda x, y: rec.add(x, y), on_click=lambda x, y, b, p: rec.add(x, y, pac.MOTION_CODES[b]))
+    n = int(rate_hz * seconds)
+    pts = [(int(960 + 400 * math.cos(i / 700)), int(540 + 300 * math.sin(i / 450))) for i in range(n)]
+    period = 1_000_000_000 // rate_hz
+    busy = 0; t_next = time.perf_counter_ns()
+    for i, (x, y) in enumerate(pts):   # paced like a real device: one event per period
+        t_next += period
+        t0 = time.perf_counter_ns()
+        if i % 500 == 499: backend.inject_click(x, y, "left")
+        else: backend.inject_move(x, y)
+        busy += time.perf_counter_ns() - t0
+        while time.perf_counter_ns() < t_next: pass
+    h.stop()
+    t0 = time.perf_counter(); steps = rec.to_steps(tolerance_px); t_simplify = time.perf_counter() - t0
+    per_event_ns = busy / max(1, n)
+    return {"rate_hz": rate_hz, "events": rec.n, "dropped": rec.dropped,
+            "capture_ns_per_event": round(per_event_ns, 1),
+            "capture_cpu_pct": round(per_event_ns * rate_hz / 1e7, 4),
+            "simplify_s": round(t_simplify, 4), "tolerance_px": tolerance_px,
+            "steps": len(steps), "compression": round(rec.n / max(1, len(steps)), 2)}
+
+def bench_sequence_io(sizes, workdir):
+    out = []
+    for n in sizes:
+        steps = [pac.Step(x=i % 1920, y=i % 1080, delay_ms=i % 250, button="left") for i in range(n)]
+        meta = pac.SequenceMeta(name=f"bench {n}", inter_delay_ms=0, repeats=1)
+        row = {"steps": n}
+        for ext in pac.SEQUENCE_EXTS:
+            path = os.path.join(workdir, f"io_{n}{ext}")
+            t0 = time.perf_counter(); pac.save_sequence_file(path, meta, steps); t_save = time.perf_counter() - t0
+            size = os.path.getsize(path)
+            t0 = time.perf_counter(); _, loaded = pac.load_sequence_file(path); t_load = time.perf_counter() - t0
+            assert len(loaded) == n
+            t0 = time.perf_counter(); _, view = pac.open_sequence(path); t_open = time.perf_counter() - t0
+            pac.close_steps(view)
+            it = iter(pac.FileSteps(path))
+            t0 = time.perf_counter(); next(it); t_first = time.perf_counter() - t0
+            it.close()
+            row[ext.lstrip(".")] = {"bytes": size, "save_s": round(t_save, 5), "load_s": round(t_load, 5),
+                                    "open_s": round(t_open, 5), "stream_first_step_s": round(t_first, 6)}
+            os.remove(path)
+        out.append(row)
+    return out
+
+def bench_manager(counts, workdir):
+    out = []
+    for n in counts:
+        d = os.path.join(workdir, f"lib_{n}"); os.makedirs(d)
+        steps = [{"x": i, "y": i, "delay_ms": 0, "button": "left"} for i in range(20)]
+        for i in range(n):
+            meta = {"name": f"Route {i}", "site": ("north", "south", "east")[i % 3], "slot": f"S{i % 40}",
+                    "date": "2024-05-%02d" % (1 + i % 28), "notes": "bench sequence", "inter_delay_ms": 100, "repeats": 1}
+            with open(os.path.join(d, f"seq_{i:06d}.json"), "w", encoding="utf-8") as f:
+                json.dump({"meta": meta, "steps": steps}, f)
+        idx_path = d + ".index.json"
+
+        ix = pac.SequenceIndex(d, idx_path)
+        t0 = time.perf_counter(); ix.refresh(); t_cold = time.perf_counter() - t0
+        ix = pac.SequenceIndex(d, idx_path)
+        t0 = time.perf_counter(); ix.refresh(); t_warm = time.perf_counter() - t0
+        t0 = time.perf_counter(); ix.refresh(); t_hot = time.perf_counter() - t0
+
+        rows = [(fn, pac.manager_row(fn, e)) for fn, e in ix.rows()]
+        t0 = time.perf_counter(); search = pac.SequenceSearch(rows); t_build = time.perf_counter() - t0
+        t0 = time.perf_counter(); hits = search.query("sou s1"); t_query = time.perf_counter() - t0
+        tree = StubTree()
+        t0 = time.perf_counter()
+        for fn in search.query(""): tree.insert("", "end", iid=fn, values=search.rows[fn])
+        t_fill = time.perf_counter() - t0
+        fn = f"seq_{n // 2:06d}.json"
+        with open(os.path.join(d, fn), "a", encoding="utf-8") as f: f.write(" ")
+        t0 = time.perf_counter()
+        for name, e in ix.update([fn]).items(): search.put(name, pac.manager_row(name, e))
+        t_one = time.perf_counter() - t0
+        out.append({"files": n, "refresh_cold_s": round(t_cold, 5), "refresh_warm_s": round(t_warm, 5),
+                    "refresh_hot_s": round(t_hot, 5), "search_build_s": round(t_build, 5),
+                    "search_query_s": round(t_query, 6), "search_hits": len(hits), "tree_fill_s": round(t_fill, 5),
+                    "update_one_file_s": round(t_one, 6)})
+        shutil.rmtree(d, ignore_errors=True)
+    return out
+
+def bench_watcher(files, burst_writes, workdir):
+    """Sequence folder watcher per backend: write -> event latency (debounce included), how a
+       burst of rewrites of one file plus a drop-in of `files` new ones is coalesced."""
+    out = {}
+    meta, steps = pac.SequenceMeta(name="w"), [pac.Step(x=1, y=2, delay_ms=10)]
+    for backend in ("inotify", "poll"):
+        d = os.path.join(workdir, f"watch-{backend}"); os.makedirs(d)
+        got, ev = [], threading.Event()
+        w = pac.SequenceWatcher(d, lambda e: (got.extend(e), ev.set()), poll_s=0.25, use_inotify=backend == "inotify")
+        if w.backend != backend: out[backend] = "unavailable"; w.stop(); continue
+        lat = []
+        for i in range(5):
+            ev.clear(); t0 = time.perf_counter()
+            pac.save_sequence_file(os.path.join(d, f"one{i}.json"), meta, steps)
+            ev.wait(5); lat.append(time.perf_counter() - t0)
+        got.clear(); ev.clear(); b0 = w.batches
+        t0 = time.perf_counter()
+        for i in range(burst_writes): pac.save_sequence_file(os.path.join(d, "burst.json"), meta, steps * (i + 1))
+        for i in range(files): pac.save_sequence_file(os.path.join(d, f"drop{i:05d}.json"), meta, steps)
+        while len(got) < files + 1 and ev.wait(5): ev.clear()
+        out[backend] = {"latency_ms": {"avg": round(sum(lat) / len(lat) * 1000, 2), "max": round(max(lat) * 1000, 2)},
+                        "writes": burst_writes + files, "events": len(got), "batches": w.batches - b0,
+                        "settle_s": round(time.perf_counter() - t0, 3)}
+        w.stop()
+        shutil.rmtree(d, ignore_errors=True)
+    return out
+
+def bench_dry_run(point_counts, delay_ms, stay_ms):
+    class Dot:
+        def __init__(self, _root, _style): pass
+        def show(self, *_): pass
+        def hide(self): pass
+        def destroy(self): pass
+    out = []
+    for n in point_counts:
+        root = StubRoot()
+        style = pac._PreviewStyle(stay_ms=stay_ms)
+        eng = pac._PreviewEngine(root, [(i, i) for i in range(n)], style, delay_ms, make_dot=Dot)
+        costs = []
+        tick = eng.tick
+        def timed_tick():
+            t = time.perf_counter_ns(); tick(); costs.append(time.perf_counter_ns() - t)
+        eng.tick = timed_tick
+        t0 = time.perf_counter(); root.after(0, eng.start); root.run(); wall = time.perf_counter() - t0
+        costs.sort()
+        out.append({"points": n, "delay_ms": delay_ms, "ticks": eng.ticks, "dots_created": eng.created,
+                    "wall_s": round(wall, 4), "tick_us": {"p50": round(pct(costs, .5) / 1e3, 2),
+                    "p99": round(pct(costs, .99) / 1e3, 2), "max": round(costs[-1] / 1e3, 2) if costs else 0}})
+    return out
+
+
+# ---------- driver ----------
+def flatten(d, prefix=""):
+    flat = {}
+    if isinstance(d, dict):
+        for k, v in d.items(): flat.update(flatten(v, f"{prefix}.{k}" if prefix else k))
+    elif isinstance(d, list):
+        for i, v in enumerate(d): flat.update(flatten(v, f"{prefix}[{i}]"))
+    elif isinstance(d, (int, float)) and not isinstance(d, bool):
+        flat[prefix] = d
+    return flat
+
+def compare(old, new):
+    a, b = flatten(old.get("results", {})), flatten(new.get("results", {}))
+    for k in sorted(set(a) & set(b)):
+        if a[k] == b[k]: continue
+        ratio = (b[k] / a[k]) if a[k] else float("inf")
+        print(f"{k:60s} {a[k]:>12} -> {b[k]:>12}  x{ratio:.2f}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    ap.add_argument("--compare", help="previous results JSON to diff against")
+    ap.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    args = ap.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="pac-bench-data-")
+    try:
+        q = args.quick
+        results = {
+            "startup": bench_startup(3 if q else 10),
+            "click_engine": bench_click_engine([10, 100, 1000], 0.5 if q else 2.0),
+            "engine_isolation": bench_engine_isolation(200, 1.0 if q else 3.0),
+            "multi": bench_multi([2, 8], 100, 0.5 if q else 2.0),
+            "hotkeys": bench_hotkeys(50 if q else 200, 20),
+            "library": bench_library(200 if q else 2000, 200, work),
+            "optimizer": bench_optimizer([1000, 10_000] if q else [1000, 10_000, 50_000]),
+            "trajectories": bench_trajectories(1000 if q else 10_000),
+            "motion_capture": bench_motion_capture(1000, 2 if q else 10),
+            "sequence_io": bench_sequence_io([10, 1000, 100_000] if q else [10, 1000, 100_000, 1_000_000], work),
+            "manager": bench_manager([10, 1000] if q else [10, 1000, 10_000], work),
+            "watcher": bench_watcher(100 if q else 1000, 50, work),
+            "dry_run": bench_dry_run([100, 1000] if q else [100, 1000, 5000], 1, 100),
+        }
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    doc = {
+        "meta": {"app_version": pac.APP_VERSION, "python": platform.python_version(),
+                 "platform": platform.platform(), "numpy": pac._numpy() is not None, "quick": q,
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), doc)
+
+if __name__ == "__main__":
+    main()
@@ -9,30 +9,55 @@ PyAutoClicker — v1.3
 - **Dry Run (Preview)**: press F7 (default) or use Tray / Sequences tab to show coloured dots where clicks WOULD happen.
 - System tray with Start/Pause/**Dry Run**/Recorder/Settings; optional bubble overlay.
 
-Dependencies: pynput, pystray, Pillow
+Dependencies: pynput, pystray, Pillow (optional: numpy)
 """
-import os, sys, time, threading, random, json, configparser, platform, re, string
+from __future__ import annotations
+import time
+_T0 = time.perf_counter()  # cold-start reference for the startup budget
+import os, sys, threading, random, json, configparser, platform, re, string, bisect, importlib, io, heapq, mmap, struct, math
+from array import array
+from collections import deque, OrderedDict
 from dataclasses import dataclass, field, asdict
 from typing import List, Tuple, Optional
 
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-
-from pynput import keyboard, mouse
-from pynput.keyboard import Key
-import pystray
-from PIL import Image
+# Importing this module has no side effects and does not load the GUI/input stack: heavy
+# dependencies are bound to lazy proxies and imported on first attribute access.
+class _LazyModule:
+    def __init__(self, name:str):
+        self.__dict__["_name"] = name
+        self.__dict__["_mod"] = None
+
+    def _load(self):
+        mod = self.__dict__["_mod"]
+        if mod is None:
+            mod = self.__dict__["_mod"] = importlib.import_module(self.__dict__["_name"])
+        return mod
+
+    def __getattr__(self, attr): return getattr(self._load(), attr)
+
+tk = _LazyModule("tkinter")
+ttk = _LazyModule("tkinter.ttk")
+messagebox = _LazyModule("tkinter.messagebox")
+filedialog = _LazyModule("tkinter.filedialog")
+keyboard = _LazyModule("pynput.keyboard")
+mouse = _LazyModule("pynput.mouse")
+pystray = _LazyModule("pystray")
+Image = _LazyModule("PIL.Image")
 
 # --- Dry-Run Preview (Windows/Tk overlay) ------------------------------------
 # Shows coloured dots where clicks WOULD happen (no real clicks are sent).
-# Uses tiny transparent Toplevels so it works across multiple monitors.
+# Uses a small pool of reusable transparent Toplevels (works across multiple monitors), driven
+# by a frame-paced scheduler on the Tk thread: dots are shown/withdrawn, never created per point.
 
-import tkinter as _tk
-import threading as _thr
+_tk = tk
 import time as _time
+from collections import deque as _deque
 from dataclasses import dataclass as _dataclass
 from typing import Any as _Any, Optional as _Optional, Tuple as _Tuple, List as _List
 
+_PREVIEW_FRAME_MS = 16    # at most one scheduler tick per frame
+_PREVIEW_POOL_MAX = 64    # dot windows per preview; beyond this the oldest visible dot is recycled
+
 @_dataclass
 class _PreviewStyle:
     dot_size: int = 18                 # diameter in px
@@ -52,6 +77,7 @@ def _dry__extract_points(sequence: _Any):
         steps = sequence
     for s in steps:
         if isinstance(s, dict):
+            if s.get("button") == "move": continue   # recorded motion: only clicks get dots
             x, y = int(s.get("x")), int(s.get("y"))
         else:
             x, y = int(s[0]), int(s[1])
@@ -65,41 +91,104 @@ def _dry__ensure_root() -> _tk.Tk:
         r.withdraw()
     return r
 
-def _dry__make_dot(x: int, y: int, color: str, label: _Optional[str], style: _PreviewStyle):
-    top = _tk.Toplevel()
-    top.overrideredirect(True)
-    try:
-        top.attributes("-topmost", True)
-        top.wm_attributes("-transparentcolor", "magenta")
-    except Exception:
-        pass
-    r = style.dot_size // 2
-    geom = f"{style.dot_size}x{style.dot_size}+{max(x - r, 0)}+{max(y - r, 0)}"
-    top.geometry(geom)
-    c = _tk.Canvas(top, width=style.dot_size, height=style.dot_size, bg="magenta", highlightthickness=0, bd=0)
-    c.pack()
-    c.create_oval(1, 1, style.dot_size-1, style.dot_size-1, fill=color, outline=color)
-    if label:
-        c.create_text(style.dot_size//2, style.dot_size//2, text=label, fill="white", font=("Segoe UI", 8, "bold"))
-    top.after(style.stay_ms, top.destroy)
+class _DotWindow:
+    """One reusable overlay dot: geometry/colour/label are reconfigured on show()."""
+    def __init__(self, root, style: _PreviewStyle):
+        self.r = style.dot_size // 2
+        top = self.top = _tk.Toplevel(root)
+        top.overrideredirect(True)
+        try:
+            top.attributes("-topmost", True)
+            top.wm_attributes("-transparentcolor", "magenta")
+        except Exception:
+            pass
+        top.withdraw()
+        top.geometry(f"{style.dot_size}x{style.dot_size}+0+0")
+        c = self.canvas = _tk.Canvas(top, width=style.dot_size, height=style.dot_size, bg="magenta", highlightthickness=0, bd=0)
+        c.pack()
+        self.oval = c.create_oval(1, 1, style.dot_size-1, style.dot_size-1)
+        self.text = c.create_text(style.dot_size//2, style.dot_size//2, text="", fill="white", font=("Segoe UI", 8, "bold"))
+
+    def show(self, x: int, y: int, color: str, label: _Optional[str]):
+        self.top.geometry(f"+{max(x - self.r, 0)}+{max(y - self.r, 0)}")
+        self.canvas.itemconfigure(self.oval, fill=color, outline=color)
+        self.canvas.itemconfigure(self.text, text=label or "")
+        self.top.deiconify()
+
+    def hide(self): self.top.withdraw()
+
+    def destroy(self):
+        try: self.top.destroy()
+        except Exception: pass
+
+class _PreviewEngine:
+    """Frame-paced dot scheduler. Dot k is due at start + k*delay; each tick expires old dots and
+       shows due ones (at most _PREVIEW_POOL_MAX), so per-frame cost stays flat however long the
+       sequence is. make_dot(root, style) lets headless callers plug in their own dot objects."""
+    def __init__(self, root, pts, style: _PreviewStyle, delay_ms: int, repeats: int = 1, make_dot=None, on_done=None):
+        self.root, self.pts, self.style = root, pts, style
+        self.delay_ns = max(0, int(delay_ms)) * 1_000_000
+        self.stay_ns = max(0, int(style.stay_ms)) * 1_000_000
+        self.total = len(pts) * max(1, repeats)
+        self.make_dot = make_dot or _DotWindow
+        self.on_done = on_done
+        self.k = 0
+        self.t0 = 0
+        self.free: _List[_Any] = []
+        self.visible = _deque()   # (expire_ns, dot); expiries are monotonic since stay is fixed
+        self.created = 0
+        self.ticks = 0
+
+    def start(self):
+        self.t0 = _time.perf_counter_ns()
+        self.tick()
+
+    def _take_dot(self):
+        if self.free: return self.free.pop()
+        if self.created < _PREVIEW_POOL_MAX:
+            self.created += 1
+            return self.make_dot(self.root, self.style)
+        _, dot = self.visible.popleft()
+        return dot
+
+    def tick(self):
+        self.ticks += 1
+        now = _time.perf_counter_ns()
+        vis, free = self.visible, self.free
+        while vis and vis[0][0] <= now:
+            dot = vis.popleft()[1]; dot.hide(); free.append(dot)
+        st, pts, n = self.style, self.pts, len(self.pts)
+        shown = 0
+        while self.k < self.total and self.t0 + self.k * self.delay_ns <= now and shown < _PREVIEW_POOL_MAX:
+            i = self.k % n
+            dot = self._take_dot()
+            dot.show(pts[i][0], pts[i][1], st.palette[i % len(st.palette)], str(i + 1) if st.show_numbers else None)
+            vis.append((now + self.stay_ns, dot))
+            self.k += 1; shown += 1
+        if self.k >= self.total and not vis:
+            for dot in free: dot.destroy()
+            free.clear()
+            if self.on_done: self.on_done()
+            return
+        nxt = vis[0][0] if vis else None
+        if self.k < self.total:
+            due = self.t0 + self.k * self.delay_ns
+            nxt = due if nxt is None else min(nxt, due)
+        wait_ms = max(_PREVIEW_FRAME_MS, -(-(nxt - now) // 1_000_000))
+        self.root.after(wait_ms, self.tick)
 
 def dry_run_preview(sequence: _Any, style: _Optional[_PreviewStyle] = None, repeats: int = 1):
-    """Public API: call to preview the current sequence (non-blocking)."""
+    """Public API: call to preview the current sequence (non-blocking). Returns the engine,
+       which runs on the Tk thread; set engine.on_done to be told when the last dot is gone."""
     pts, inter = _dry__extract_points(sequence)
     if not pts:
-        return
+        return None
     st = style or _PreviewStyle()
     delay = st.step_delay_ms if st.step_delay_ms is not None else (inter if inter is not None else 150)
-
-    def worker():
-        _dry__ensure_root()
-        for _ in range(max(1, repeats)):
-            for i, (x, y) in enumerate(pts, start=1):
-                color = st.palette[(i-1) % len(st.palette)]
-                label = str(i) if st.show_numbers else None
-                _dry__make_dot(x, y, color, label, st)
-                _time.sleep(max(0, delay) / 1000.0)
-    _thr.Thread(target=worker, daemon=True).start()
+    root = _dry__ensure_root()
+    engine = _PreviewEngine(root, pts, st, delay, repeats)
+    root.after(0, engine.start)
+    return engine
 # ----------------------------------------------------------------------------- 
 
 IS_WINDOWS = platform.system() == "Windows"
@@ -111,6 +200,18 @@ if IS_WINDOWS:
 else:
     winsound = None
 
+_np = False  # not probed yet
+def _numpy():
+    """numpy if installed (vectorised sampling), else None; imported on first use."""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except Exception:
+            _np = None
+    return _np
+
 APP_NAME = "PyAutoClicker"
 APP_VERSION = "1.3"
 CONFIG_DIR_NAME = "config"
@@ -120,18 +221,23 @@ INI_NAME = "PyAutoClicker.ini"
 ICON_NAME = "pyautoclicker.ico"
 ICON_PNG = "pyautoclicker.png"
 
+STARTUP_BUDGET_MS = 250   # process start -> global hotkeys listening
+
 def app_dirs():
+    """Resolve the app folders next to the script (pure; ensure_app_dirs() creates them)."""
     base = os.path.dirname(os.path.abspath(sys.argv[0]))
     config_dir = os.path.join(base, CONFIG_DIR_NAME)
     sequences_dir = os.path.join(base, SEQUENCES_DIR_NAME)
     assets_dir = os.path.join(base, ASSETS_DIR_NAME)
-    os.makedirs(config_dir, exist_ok=True)
-    os.makedirs(sequences_dir, exist_ok=True)
-    os.makedirs(assets_dir, exist_ok=True)
     return base, config_dir, sequences_dir, assets_dir
 
+def ensure_app_dirs():
+    for d in (CONFIG_DIR, SEQUENCES_DIR, ASSETS_DIR):
+        os.makedirs(d, exist_ok=True)
+
 BASE_DIR, CONFIG_DIR, SEQUENCES_DIR, ASSETS_DIR = app_dirs()
 INI_PATH = os.path.join(CONFIG_DIR, INI_NAME)
+SEQUENCE_INDEX_PATH = os.path.join(BASE_DIR, "sequences.index.json")  # lives next to SEQUENCES_DIR
 ICON_PATH = os.path.join(ASSETS_DIR, ICON_NAME)
 ICON_PNG_PATH = os.path.join(ASSETS_DIR, ICON_PNG)
 
@@ -236,6 +342,12 @@ class Settings:
     jitter_px: int = 0
     max_cps: int = 25
     double_click: int = 0
+    humanize_dist: str = "uniform"  # uniform / gaussian / lognormal
+    humanize_seed: int = -1         # -1 = fresh randomness every run
+
+    # Runtime metrics export (written to CONFIG_DIR while a run is active)
+    metrics_export: str = "off"     # off / jsonl / prom
+    metrics_export_secs: int = 5
 
     # Hotkeys
     hk_start_stop: str = "<f6>"
@@ -258,6 +370,26 @@ class Settings:
     show_bubble: int = 1
     auto_save_after_record: int = 1
 
+    # Sequence files
+    sequence_format: str = "json"   # json / pacseq (binary; for very long recordings)
+
+    # Recorder motion capture
+    record_motion: int = 0           # also record cursor moves between clicks
+    motion_tolerance_px: int = 2     # path simplification tolerance (0 = keep every sample)
+    motion_buffer_events: int = 262144   # capture ring size (power of two; ~4 min at 1 kHz)
+
+    # Replay timing (applies to recorded delays; changeable while a run is active)
+    replay_speed_pct: int = 100      # 50 = half speed, 400 = 4x
+    idle_gap_cap_ms: int = 0         # recorded gaps longer than this are shortened to it (0 = off)
+
+    # Cursor glide between click targets (instead of jumping)
+    move_style: str = "off"          # off / linear / minjerk / bezier
+    move_ms: int = 120               # glide duration, taken from the end of each step's delay
+    move_rate_hz: int = 125          # glide points per second
+
+    # Run the click engine in its own process (its timing can't be stalled by UI work)
+    engine_process: int = 0
+
     # Sequence state
     current_seq: List[Step] = field(default_factory=list)
     current_meta: SequenceMeta = field(default_factory=SequenceMeta)
@@ -268,6 +400,10 @@ class Settings:
         self.jitter_px = max(0, int(self.jitter_px))
         self.max_cps = max(1, int(self.max_cps))
         self.double_click = 1 if int(self.double_click) else 0
+        self.humanize_dist = self.humanize_dist if self.humanize_dist in HUMANIZE_DISTS else "uniform"
+        self.humanize_seed = int(self.humanize_seed) if int(self.humanize_seed) >= 0 else -1
+        self.metrics_export = self.metrics_export if self.metrics_export in METRICS_EXPORTS else "off"
+        self.metrics_export_secs = max(1, int(self.metrics_export_secs))
         # normalize hotkeys (falls back to defaults if invalid)
         self.hk_start_stop = normalize_hotkey(self.hk_start_stop) or "<f6>"
         self.hk_pause      = normalize_hotkey(self.hk_pause) or "<f9>"
@@ -281,12 +417,46 @@ class Settings:
         self.hotkeys_enabled = 1 if int(self.hotkeys_enabled) else 0
         self.show_bubble     = 1 if int(self.show_bubble) else 0
         self.auto_save_after_record = 1 if int(self.auto_save_after_record) else 0
+        self.sequence_format = self.sequence_format if self.sequence_format in SEQUENCE_FORMATS else "json"
+        self.record_motion = 1 if int(self.record_motion) else 0
+        self.motion_tolerance_px = max(0, int(self.motion_tolerance_px))
+        self.motion_buffer_events = 1 << (max(1024, min(1 << 24, int(self.motion_buffer_events))) - 1).bit_length()
+        self.replay_speed_pct = max(REPLAY_SPEED_MIN_PCT, min(REPLAY_SPEED_MAX_PCT, int(self.replay_speed_pct)))
+        self.idle_gap_cap_ms = max(0, int(self.idle_gap_cap_ms))
+        self.move_style = self.move_style if self.move_style in MOVE_STYLES else "off"
+        self.move_ms = max(0, min(5000, int(self.move_ms)))
+        self.move_rate_hz = max(10, min(1000, int(self.move_rate_hz)))
+        self.engine_process = 1 if int(self.engine_process) else 0
         self.dryrun_show_numbers    = 1 if int(self.dryrun_show_numbers) else 0
         try:
             self.dryrun_step_delay_ms = int(self.dryrun_step_delay_ms)
         except Exception:
             self.dryrun_step_delay_ms = -1
 
+def read_settings(path: str) -> Tuple[Settings, Optional[str]]:
+    """Settings from the INI at path (defaults for anything missing), plus the raw INI text."""
+    s = Settings(); text = None
+    cfg = configparser.ConfigParser()
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f: text = f.read()
+            cfg.read_string(text)
+        except Exception:
+            text = None
+    if "General" in cfg:
+        g = cfg["General"]
+        for k in s.__dict__.keys():
+            if k in ("current_seq","current_meta"): continue
+            if k in g:
+                val = g.get(k)
+                if isinstance(getattr(s, k), int):
+                    try: setattr(s, k, int(val))
+                    except: pass
+                else:
+                    setattr(s, k, val)
+    s.clamp()
+    return s, text
+
 # ---------- utils ----------
 def slugify(name: str) -> str:
     name = name.strip()
@@ -294,15 +464,16 @@ def slugify(name: str) -> str:
     name = re.sub(r'[<>:"/\\|?*\n\r\t]', "_", name)
     return name
 
-def unique_path(dirpath: str, base_name: str) -> str:
+def unique_path(dirpath: str, base_name: str, ext: str = ".json", taken=()) -> str:
+    """First free name; `taken` holds paths that are claimed but not on disk yet (queued writes)."""
     base = slugify(base_name)
-    path = os.path.join(dirpath, base + ".json")
-    if not os.path.exists(path):
+    path = os.path.join(dirpath, base + ext)
+    if not os.path.exists(path) and path not in taken:
         return path
     i = 2
     while True:
-        path = os.path.join(dirpath, f"{base} ({i}).json")
-        if not os.path.exists(path):
+        path = os.path.join(dirpath, f"{base} ({i}){ext}")
+        if not os.path.exists(path) and path not in taken:
             return path
         i += 1
 
@@ -310,23 +481,2383 @@ def ellipsis(s: str, maxlen: int = 24) -> str:
     s = s or ""
     return s if len(s) <= maxlen else s[:maxlen-1] + "…"
 
+# ---------- Persistence ----------
+# Every file the app owns is replaced atomically (temp file in the same folder, fsync, os.replace),
+# so a crash mid-write leaves the previous version, never a truncated one. The GUI hands writes to
+# a WriteBehind thread: it never blocks on disk, and repeated writes to one path coalesce into one.
+WRITE_BEHIND_MS = 250   # how long a queued write waits for newer versions of the same file
+
+def atomic_write(path: str, data):
+    """Replace path with data (bytes, or str written as UTF-8) in one step."""
+    if isinstance(data, str): data = data.encode("utf-8")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # unique per writer thread
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+class WriteBehind:
+    """Background writer. submit(path, render) queues render() -> bytes|str for path, replacing any
+       version still queued; render runs on the writer thread, so pass it a snapshot of the data.
+       A render returning None skips the write. Failures go to on_error(path, exc) on the writer
+       thread."""
+    def __init__(self, delay_ms: int = WRITE_BEHIND_MS, on_error=None):
+        self.delay = delay_ms / 1000.0
+        self.on_error = on_error
+        self._pending: dict = {}   # path -> render; insertion order = write order
+        self._writing: set = set()
+        self._cv = threading.Condition()
+        self._closed = False
+        self._now = False          # flush requested: skip the coalescing delay
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, render):
+        with self._cv:
+            if self._closed: raise RuntimeError("WriteBehind is closed")
+            self._pending.pop(path, None); self._pending[path] = render
+            self._cv.notify_all()
+
+    def pending_paths(self) -> set:
+        """Paths queued or being written; they may not exist on disk yet."""
+        with self._cv: return set(self._pending) | self._writing
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued now and wait for it; False on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cv:
+            self._now = True; self._cv.notify_all()
+            while self._pending or self._writing:
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0: return False
+                self._cv.wait(left)
+            return True
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        ok = self.flush(timeout)
+        with self._cv:
+            self._closed = True; self._cv.notify_all()
+        self._thread.join(timeout)
+        return ok
+
+    def _run(self):
+        cv = self._cv
+        while True:
+            with cv:
+                while not self._pending and not self._closed: cv.wait()
+                if not self._pending: return
+                if not self._now:   # let a burst of edits land first
+                    cv.wait_for(lambda: self._now or self._closed, self.delay)
+                batch, self._pending = self._pending, {}
+                self._writing = set(batch); self._now = False
+            for path, render in batch.items():
+                try:
+                    data = render()
+                    if data is not None: atomic_write(path, data)
+                except Exception as e:
+                    if self.on_error:
+                        try: self.on_error(path, e)
+                        except Exception: pass
+                with cv:
+                    self._writing.discard(path); cv.notify_all()
+
+# ---------- Sequence files ----------
+# Two on-disk formats, picked by extension: JSON (.json, human-editable, the default) and the
+# binary .pacseq container below. Both round-trip SequenceMeta + Steps losslessly.
+SEQUENCE_BUTTONS = ("left", "right", "middle", "move")   # "move": a recorded cursor move, not a click
+PACSEQ_EXT = ".pacseq"
+SEQUENCE_EXTS = (".json", PACSEQ_EXT)
+SEQUENCE_FORMATS = ("json", "pacseq")
+
+def is_pacseq(path: str) -> bool: return path.lower().endswith(PACSEQ_EXT)
+
+def load_sequence_file(path: str) -> Tuple[SequenceMeta, List[Step]]:
+    if is_pacseq(path):
+        meta, packed = open_pacseq(path)
+        try: return meta, list(packed)
+        finally: packed.close()
+    with open(path,"r",encoding="utf-8") as f: data=json.load(f)
+    return SequenceMeta(**data.get("meta",{})), [Step(**st) for st in data.get("steps",[])]
+
+def sequence_bytes(path: str, meta: SequenceMeta, steps):
+    """The file content (bytes-like) save_sequence_file would write for path's format."""
+    if is_pacseq(path): return pack_pacseq(meta, steps)
+    payload = {"meta": asdict(meta), "steps":[asdict(s) for s in steps]}
+    return json.dumps(payload, indent=2).encode("utf-8")
+
+def save_sequence_file(path: str, meta: SequenceMeta, steps: List[Step]):
+    atomic_write(path, sequence_bytes(path, meta, steps))
+
+def open_sequence(path: str):
+    """(meta, steps) without materialising a .pacseq payload: steps is then a PackedSteps view;
+       call close_steps(steps) when done."""
+    return open_pacseq(path) if is_pacseq(path) else load_sequence_file(path)
+
+def close_steps(steps):
+    if isinstance(steps, PackedSteps): steps.close()
+
+def convert_sequence(src: str, dst: str) -> int:
+    """Copy a sequence between formats (by extension); returns the step count."""
+    meta, steps = open_sequence(src)
+    try:
+        save_sequence_file(dst, meta, steps)
+        return len(steps)
+    finally:
+        close_steps(steps)
+
+def sequence_preview_data(path: str) -> dict:
+    """A saved sequence in the shape dry_run_preview() takes ({"meta", "steps"})."""
+    if not is_pacseq(path):
+        with open(path, "r", encoding="utf-8") as f: return json.load(f)
+    meta, packed = open_pacseq(path)
+    try: return {"meta": asdict(meta), "steps": [(x, y) for x, y, _, b in packed.records() if b != "move"]}
+    finally: packed.close()
+
+# ----- .pacseq -----
+# Little-endian: a fixed 20-byte header (magic, version, record size, step count, meta length),
+# the SequenceMeta as UTF-8 JSON (its fields are free text, so they are length-prefixed rather
+# than fixed-width), zero padding to a 16-byte boundary, then one fixed-width record per step.
+# Reading maps the file and unpacks records straight out of the mapping; the manager reads only
+# the header and meta.
+PACSEQ_MAGIC = b"PACSEQ\r\n"
+PACSEQ_VERSION = 1
+_PACSEQ_HEAD = struct.Struct("<8sHHII")   # magic, version, record size, steps, meta bytes
+_PACSEQ_STEP = struct.Struct("<iiIB3x")   # x, y, delay_ms, button code (index into SEQUENCE_BUTTONS)
+
+def _pacseq_parse_head(buf) -> Tuple[SequenceMeta, int, int]:
+    """(meta, step count, payload offset) from the start of a .pacseq file."""
+    if len(buf) < _PACSEQ_HEAD.size: raise ValueError("not a .pacseq file (too short)")
+    magic, ver, rec, n, mlen = _PACSEQ_HEAD.unpack_from(buf)
+    if magic != PACSEQ_MAGIC: raise ValueError("not a .pacseq file (bad magic)")
+    if ver != PACSEQ_VERSION or rec != _PACSEQ_STEP.size:
+        raise ValueError(f"unsupported .pacseq version {ver} (record size {rec})")
+    end = _PACSEQ_HEAD.size + mlen
+    if len(buf) < end: raise ValueError("truncated .pacseq header")
+    meta = SequenceMeta(**json.loads(bytes(buf[_PACSEQ_HEAD.size:end]).decode("utf-8")))
+    return meta, n, (end + 15) & ~15
+
+def read_pacseq_header(path: str) -> Tuple[SequenceMeta, int]:
+    """(meta, step count) without reading the step payload."""
+    with open(path, "rb") as f:
+        head = f.read(_PACSEQ_HEAD.size)
+        if len(head) == _PACSEQ_HEAD.size:
+            head += f.read(_PACSEQ_HEAD.unpack(head)[4])
+    meta, n, _ = _pacseq_parse_head(head)
+    return meta, n
+
+class PackedSteps:
+    """Read-only, list-like view of a .pacseq step payload backed by mmap (no copy of the file).
+       Indexing/iterating yields Step; records() yields raw (x, y, delay_ms, button) tuples."""
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _PACSEQ_HEAD.size: raise ValueError("not a .pacseq file (too short)")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        try:
+            self.meta, self.n, off = _pacseq_parse_head(self._buf)
+            if size < off + self.n * _PACSEQ_STEP.size: raise ValueError("truncated .pacseq payload")
+        except Exception:
+            self.close(); raise
+        self._mv = self._buf[off:off + self.n * _PACSEQ_STEP.size]
+
+    def __len__(self): return self.n
+
+    def records(self):
+        names = SEQUENCE_BUTTONS
+        for x, y, d, b in _PACSEQ_STEP.iter_unpack(self._mv):
+            yield x, y, d, names[b]   # IndexError: corrupt button code
+
+    def __iter__(self):
+        for x, y, d, b in self.records(): yield Step(x, y, d, b)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0: i += self.n
+        if not 0 <= i < self.n: raise IndexError(i)
+        x, y, d, b = _PACSEQ_STEP.unpack_from(self._mv, i * _PACSEQ_STEP.size)
+        return Step(x, y, d, SEQUENCE_BUTTONS[b])
+
+    def close(self):
+        for v in ("_mv", "_buf"):
+            mv = self.__dict__.pop(v, None)
+            if mv is not None: mv.release()
+        if self._mm is not None:
+            self._mm.close(); self._mm = None
+
+def open_pacseq(path: str) -> Tuple[SequenceMeta, PackedSteps]:
+    p = PackedSteps(path)
+    return p.meta, p
+
+def save_pacseq(path: str, meta: SequenceMeta, steps):
+    atomic_write(path, pack_pacseq(meta, steps))
+
+def pack_pacseq(meta: SequenceMeta, steps) -> bytearray:
+    codes = {b: i for i, b in enumerate(SEQUENCE_BUTTONS)}
+    mb = json.dumps(asdict(meta), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    off = (_PACSEQ_HEAD.size + len(mb) + 15) & ~15
+    rs, pack = _PACSEQ_STEP.size, _PACSEQ_STEP.pack_into
+    steps = steps if hasattr(steps, "__len__") else list(steps)
+    buf = bytearray(off + len(steps) * rs)
+    _PACSEQ_HEAD.pack_into(buf, 0, PACSEQ_MAGIC, PACSEQ_VERSION, rs, len(steps), len(mb))
+    buf[_PACSEQ_HEAD.size:_PACSEQ_HEAD.size + len(mb)] = mb
+    pos = off
+    try:
+        for st in steps:
+            pack(buf, pos, st.x, st.y, st.delay_ms, codes[st.button]); pos += rs
+    except KeyError as e:
+        raise ValueError(f"step {(pos - off) // rs}: button {e.args[0]!r} can't be stored in .pacseq")
+    except struct.error as e:
+        raise ValueError(f"step {(pos - off) // rs}: {e}")
+    return buf
+
+def step_problems(i: int, st) -> List[str]:
+    """Problems with one parsed step row (index i); empty if valid."""
+    if not isinstance(st, dict): return [f"steps[{i}]: expected an object"]
+    errs = [f"steps[{i}].{k}: expected an int, got {st.get(k)!r}" for k in ("x", "y") if not isinstance(st.get(k), int)]
+    d = st.get("delay_ms", 0)
+    if not isinstance(d, int) or d < 0: errs.append(f"steps[{i}].delay_ms: expected an int >= 0, got {d!r}")
+    if st.get("button", "left") not in SEQUENCE_BUTTONS: errs.append(f"steps[{i}].button: unknown {st.get('button')!r}")
+    extra = set(st) - set(Step.__dataclass_fields__)
+    if extra: errs.append(f"steps[{i}]: unknown field(s) {', '.join(sorted(extra))}")
+    return errs
+
+def validate_sequence_data(data) -> List[str]:
+    """Problems found in a parsed sequence document ({"meta": {...}, "steps": [...]}); empty if valid."""
+    if not isinstance(data, dict): return ["top level must be an object with 'meta' and 'steps'"]
+    errs = []
+    meta = data.get("meta", {})
+    if not isinstance(meta, dict):
+        errs.append("'meta' must be an object")
+    else:
+        for k, v in meta.items():
+            if k not in SequenceMeta.__dataclass_fields__: errs.append(f"meta: unknown field '{k}'")
+            elif k in ("inter_delay_ms", "repeats") and (not isinstance(v, int) or v < 0):
+                errs.append(f"meta.{k}: expected an int >= 0, got {v!r}")
+    steps = data.get("steps")
+    if not isinstance(steps, list): return errs + ["'steps' must be a list"]
+    for i, st in enumerate(steps):
+        errs += step_problems(i, st)
+        if len(errs) >= 50:
+            errs.append("... (stopping after 50 problems)"); break
+    return errs
+
+def sequence_stats(meta: SequenceMeta, steps: List[Step], max_cps: int = 20) -> dict:
+    """Step counts, bounds and the nominal duration of one pass / the whole run (no humanization)."""
+    floor = int(1000 / max(1, max_cps))
+    inter = meta.inter_delay_ms if meta.inter_delay_ms > 0 else None
+    delays = [st.delay_ms if st.button == "move" else max(inter if inter is not None else st.delay_ms, floor) for st in steps]
+    buttons = {}
+    for st in steps: buttons[st.button] = buttons.get(st.button, 0) + 1
+    pass_ms = sum(delays)
+    return {
+        "name": meta.name, "steps": len(steps), "buttons": buttons,
+        "bounds": [min(st.x for st in steps), min(st.y for st in steps),
+                   max(st.x for st in steps), max(st.y for st in steps)] if steps else None,
+        "delay_ms": {"min": min(delays), "max": max(delays), "avg": round(pass_ms / len(delays), 2)} if delays else None,
+        "repeats": meta.repeats, "pass_s": round(pass_ms / 1000, 3),
+        "total_s": round(pass_ms * meta.repeats / 1000, 3) if meta.repeats > 0 else None,
+    }
+
+# ---------- Sequence optimizer ----------
+# Clean-up for recorded sequences. Dedupe drops a step lying within tol_px of the previous kept
+# step with the same button and carries its delay into the next kept step, so the rest keeps its
+# rhythm. Reorder re-tours each run of consecutive same-button clicks (recorded moves and button
+# changes pin the order around them) to cut cursor travel: nearest neighbour over a grid hash,
+# then 2-opt over k-nearest candidate lists until no move improves or the time budget runs out.
+# The run's first position is the previous step (or its own first click) and stays put; delays
+# stay with their position, so timing is unchanged by a reorder.
+OPTIMIZE_NEIGHBOURS = 8
+OPTIMIZE_BUDGET_S = 3.0   # 2-opt time for the whole sequence, shared by its runs by size
+OPTIMIZE_MIN_RUN = 4    # shorter runs have nothing worth reordering
+
+def travel_px(steps) -> float:
+    """Straight-line cursor travel from step to step."""
+    d, prev = 0.0, None
+    for st in steps:
+        if prev is not None: d += math.hypot(st.x - prev.x, st.y - prev.y)
+        prev = st
+    return d
+
+def dedupe_steps(steps: List[Step], tol_px: int = 0) -> List[Step]:
+    """Drop repeats of the previous kept step (same button, within tol_px). A dropped step's delay
+       moves to the next kept one, or for a trailing run onto the last kept step, so the pass
+       keeps its length (the sum of delays is unchanged)."""
+    out, carry, t2 = [], 0, tol_px * tol_px
+    for st in steps:
+        if out:
+            p = out[-1]
+            if st.button == p.button and (st.x - p.x) ** 2 + (st.y - p.y) ** 2 <= t2:
+                carry += st.delay_ms; continue
+        out.append(Step(st.x, st.y, st.delay_ms + carry, st.button) if carry else st)
+        carry = 0
+    if carry:
+        p = out[-1]; out[-1] = Step(p.x, p.y, p.delay_ms + carry, p.button)
+    return out
+
+def _grid(xs, ys, idx, cell: float) -> dict:
+    cells: dict = {}
+    for i in idx: cells.setdefault((int(xs[i] // cell), int(ys[i] // cell)), []).append(i)
+    return cells
+
+def _nn_order(xs, ys, cell: float) -> List[int]:
+    """Greedy nearest-neighbour path over points 1..n-1, starting at point 0."""
+    n = len(xs)
+    cells = {k: set(v) for k, v in _grid(xs, ys, range(1, n), cell).items()}
+    order, cur = [0], 0
+    for _ in range(n - 1):
+        cx, cy = xs[cur], ys[cur]
+        gx, gy = int(cx // cell), int(cy // cell)
+        best, bd, r = -1, float("inf"), 0
+        while best < 0 or bd > ((r - 1) * cell) ** 2:   # unscanned rings (>= r) are >= (r-1)*cell away
+            if (2 * r + 1) ** 2 > len(cells):      # sparse leftovers: scan what remains
+                for pts in cells.values():
+                    for i in pts:
+                        d = (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2
+                        if d < bd: best, bd = i, d
+                break
+            for gxx in range(gx - r, gx + r + 1):
+                for gyy in ((gy - r, gy + r) if gxx not in (gx - r, gx + r) and r else range(gy - r, gy + r + 1)):
+                    pts = cells.get((gxx, gyy))
+                    if not pts: continue
+                    for i in pts:
+                        d = (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2
+                        if d < bd: best, bd = i, d
+            r += 1
+        key = (int(xs[best] // cell), int(ys[best] // cell))
+        cells[key].discard(best)
+        if not cells[key]: del cells[key]
+        order.append(best); cur = best
+    return order
+
+def _neighbours(xs, ys, cell: float, k: int) -> List[List[int]]:
+    cells = _grid(xs, ys, range(len(xs)), cell)
+    out, get = [], cells.get
+    for i in range(len(xs)):
+        x, y = xs[i], ys[i]
+        gx, gy = int(x // cell), int(y // cell)
+        for r in (1, 2, 4):
+            cand = [((xs[j] - x) ** 2 + (ys[j] - y) ** 2, j) for a in range(gx - r, gx + r + 1)
+                    for b in range(gy - r, gy + r + 1) for j in get((a, b), ()) if j != i]
+            if len(cand) >= k: break
+        cand.sort()
+        out.append([j for _, j in cand[:k]])
+    return out
+
+def tour_order(xs, ys, budget_s: float = OPTIMIZE_BUDGET_S, k: int = OPTIMIZE_NEIGHBOURS) -> List[int]:
+    """Short open path through all points starting at point 0 (which stays first); budget_s
+       bounds the 2-opt phase."""
+    n = len(xs)
+    if n < 3: return list(range(n))
+    w = (max(xs) - min(xs)) or 1; h = (max(ys) - min(ys)) or 1
+    cell = max(1.0, math.sqrt(w * h / n) * 1.5)   # ~2 points per cell
+    t = _nn_order(xs, ys, cell)
+    nb = _neighbours(xs, ys, cell, k)
+    pos = [0] * n
+    for i, v in enumerate(t): pos[v] = i
+    hyp = math.hypot
+    queue = deque(t); queued = [True] * n
+    deadline = time.perf_counter() + budget_s
+    while queue and time.perf_counter() < deadline:
+        a = queue.popleft(); queued[a] = False
+        i = pos[a]
+        for c in nb[a]:
+            j = pos[c]
+            if -1 <= i - j <= 1: continue
+            lo, hi = (i, j) if i < j else (j, i)
+            A, B, C = t[lo], t[lo + 1], t[hi]
+            D = t[hi + 1] if hi + 1 < n else -1
+            old = hyp(xs[A] - xs[B], ys[A] - ys[B])
+            new = hyp(xs[A] - xs[C], ys[A] - ys[C])
+            if D >= 0:
+                old += hyp(xs[C] - xs[D], ys[C] - ys[D]); new += hyp(xs[B] - xs[D], ys[B] - ys[D])
+            if new < old - 1e-9:   # reverse t[lo+1..hi]: edges A-B, C-D become A-C, B-D
+                t[lo + 1:hi + 1] = t[lo + 1:hi + 1][::-1]
+                for q in range(lo + 1, hi + 1): pos[t[q]] = q
+                for v in (A, B, C, D, a):
+                    if v >= 0 and not queued[v]: queue.append(v); queued[v] = True
+                break
+    return t
+
+def optimize_sequence(steps: List[Step], dedupe_px: Optional[int] = 0, reorder: bool = False,
+                      budget_s: float = OPTIMIZE_BUDGET_S, meta: Optional[SequenceMeta] = None,
+                      max_cps: int = 20) -> Tuple[List[Step], dict]:
+    """(new steps, report). dedupe_px None skips dedupe; reorder re-tours same-button click runs."""
+    t0 = time.perf_counter()
+    meta = meta or SequenceMeta()
+    out = list(steps) if dedupe_px is None else dedupe_steps(steps, max(0, int(dedupe_px)))
+    runs = 0
+    if reorder:
+        i, n = 0, len(out)
+        while i < n:
+            j = i
+            while j + 1 < n and out[j + 1].button == out[i].button: j += 1
+            if out[i].button != "move" and j - i + 1 >= OPTIMIZE_MIN_RUN:
+                anchor = i - 1 if i > 0 else i   # where the cursor is when the run starts
+                idx = list(range(anchor, j + 1))
+                order = tour_order([out[q].x for q in idx], [out[q].y for q in idx], budget_s * len(idx) / n)
+                seq = [out[idx[q]] for q in order]
+                if anchor < i: seq = seq[1:]
+                delays = [out[q].delay_ms for q in range(i, j + 1)]   # positions keep their delays
+                for q, st, d in zip(range(i, j + 1), seq, delays):
+                    out[q] = st if st.delay_ms == d else Step(st.x, st.y, d, st.button)
+                runs += 1
+            i = j + 1
+    before, after = sequence_stats(meta, steps, max_cps), sequence_stats(meta, out, max_cps)
+    return out, {"steps_before": len(steps), "steps_after": len(out),
+                 "travel_before_px": round(travel_px(steps)), "travel_after_px": round(travel_px(out)),
+                 "pass_s_before": before["pass_s"], "pass_s_after": after["pass_s"],
+                 "runs_reordered": runs, "secs": round(time.perf_counter() - t0, 3)}
+
+def optimize_report_text(r: dict) -> str:
+    pct = lambda a, b: f"{(b - a) / a * 100:+.1f}%" if a else "±0%"
+    return (f"steps {r['steps_before']} -> {r['steps_after']}\n"
+            f"cursor travel {r['travel_before_px']} -> {r['travel_after_px']} px ({pct(r['travel_before_px'], r['travel_after_px'])})\n"
+            f"one pass ~{r['pass_s_before']}s -> ~{r['pass_s_after']}s; {r['runs_reordered']} run(s) reordered in {r['secs']}s")
+
+# ---------- Step sources ----------
+# The engines accept any re-iterable step source, not just List[Step]: every pass calls iter()
+# again, so repeats re-open a file or regenerate a pattern instead of keeping the whole run in
+# RAM. Items may be Step objects or (x, y, delay_ms, button) tuples; step_rows() normalises.
+_JSON_WS = re.compile(r"\s*")
+_JSON_DECODER = json.JSONDecoder()
+
+class _JsonStream:
+    """Incremental reader for one JSON document: raw_decode()s values out of a sliding text buffer."""
+    def __init__(self, f, chunk: int):
+        self.f, self.chunk = f, chunk
+        self.buf, self.pos, self.eof = "", 0, False
+
+    def _more(self) -> bool:
+        if self.eof: return False
+        data = self.f.read(self.chunk)
+        if not data:
+            self.eof = True; return False
+        self.buf = self.buf[self.pos:] + data; self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            self.pos = _JSON_WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf): return self.buf[self.pos]
+            if not self._more(): return ""
+
+    def take(self, allowed: str) -> str:
+        c = self.peek()
+        if not c or c not in allowed: raise ValueError(f"malformed sequence file near offset {self.pos}: expected {allowed!r}")
+        self.pos += 1
+        return c
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                v, end = _JSON_DECODER.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:   # a number ending at the buffer edge may be cut
+                    self.pos = end
+                    return v
+            except ValueError:
+                if self.eof: raise
+            if not self._more(): self.eof = True
+
+def iter_json_sequence(f, chunk: int = 1 << 16):
+    """Stream a sequence JSON document: yields ("meta", dict) and ("step", dict) in file order,
+       holding at most about one chunk plus one value in memory."""
+    js = _JsonStream(f, chunk)
+    js.take("{")
+    if js.peek() == "}": return
+    while True:
+        key = js.value(); js.take(":")
+        if key == "steps":
+            js.take("[")
+            if js.peek() == "]": js.pos += 1
+            else:
+                while True:
+                    yield "step", js.value()
+                    if js.take(",]") == "]": break
+        else:
+            v = js.value()
+            if key == "meta": yield "meta", v
+        if js.take(",}") == "}": return
+
+class FileSteps:
+    """Step source over a saved .json/.pacseq file. Each iteration re-opens the file and streams
+       (x, y, delay_ms, button) tuples, so memory stays bounded however long the sequence is.
+       A malformed row raises ValueError("<path>: steps[i]...") when it is reached."""
+    def __init__(self, path: str, chunk: int = 1 << 16):
+        self.path, self.chunk = path, chunk
+
+    def __iter__(self):
+        if is_pacseq(self.path):
+            p = PackedSteps(self.path)
+            try: yield from p.records()
+            except IndexError: raise ValueError(f"{self.path}: step with an unknown button code") from None
+            finally: p.close()
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            i = 0
+            for kind, v in iter_json_sequence(f, self.chunk):
+                if kind != "step": continue
+                errs = step_problems(i, v)
+                if errs: raise ValueError(f"{self.path}: {'; '.join(errs)}")
+                yield v["x"], v["y"], v.get("delay_ms", 0), v.get("button", "left")
+                i += 1
+
+class GridSweep:
+    """Generated step source: a cols x rows grid over (x0, y0)-(x1, y1), row by row; snake=True
+       reverses every other row so the cursor never jumps back across the rectangle."""
+    def __init__(self, x0:int, y0:int, x1:int, y1:int, cols:int, rows:int, delay_ms:int=100,
+                 button:str="left", snake:bool=True):
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.cols, self.rows = max(1, cols), max(1, rows)
+        self.delay_ms, self.button, self.snake = delay_ms, button, snake
+
+    def __len__(self): return self.cols * self.rows
+
+    def __iter__(self):
+        c, r = self.cols, self.rows
+        dx = (self.x1 - self.x0) / (c - 1) if c > 1 else 0
+        dy = (self.y1 - self.y0) / (r - 1) if r > 1 else 0
+        for j in range(r):
+            y = round(self.y0 + j * dy)
+            cols = range(c - 1, -1, -1) if self.snake and j % 2 else range(c)
+            for i in cols: yield round(self.x0 + i * dx), y, self.delay_ms, self.button
+
+def step_rows(steps):
+    """One pass over a step source as (x, y, delay_ms, button) tuples."""
+    if isinstance(steps, PackedSteps): return steps.records()
+    return ((st.x, st.y, st.delay_ms, st.button) if isinstance(st, Step) else tuple(st) for st in steps)
+
+def read_sequence_meta(path: str) -> SequenceMeta:
+    """A saved sequence's meta without loading its steps (JSON files are streamed up to "meta")."""
+    if is_pacseq(path): return read_pacseq_header(path)[0]
+    with open(path, "r", encoding="utf-8") as f:
+        for kind, v in iter_json_sequence(f):
+            if kind == "meta": return SequenceMeta(**v)
+    return SequenceMeta()
+
+# ---------- Sequence index ----------
+# Persistent cache of each sequence file's meta fields and step count, keyed by file name and
+# validated by (mtime_ns, size). refresh() only stats the folder and re-parses files whose
+# stat changed, so opening the manager costs O(changed files) instead of O(all files x size).
+SEQUENCE_INDEX_VERSION = 1
+META_FIELDS = ("name", "site", "slot", "date", "notes", "inter_delay_ms", "repeats")
+
+class SequenceIndex:
+    def __init__(self, seq_dir: str = SEQUENCES_DIR, path: str = SEQUENCE_INDEX_PATH):
+        self.seq_dir = seq_dir
+        self.path = path
+        self.entries: dict = {}   # file name -> {"mtime_ns", "size", "meta", "steps"} or {..., "error"}
+        self._loaded = False
+
+    def load(self):
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SEQUENCE_INDEX_VERSION and data.get("dir") == os.path.realpath(self.seq_dir):
+                self.entries = data.get("files", {})
+        except Exception:
+            self.entries = {}
+
+    def save(self):
+        payload = {"version": SEQUENCE_INDEX_VERSION, "dir": os.path.realpath(self.seq_dir), "files": self.entries}
+        try: atomic_write(self.path, json.dumps(payload, separators=(",", ":")))
+        except Exception: pass
+
+    @staticmethod
+    def parse_file(path: str, mtime_ns: int, size: int) -> dict:
+        entry = {"mtime_ns": mtime_ns, "size": size}
+        try:
+            if is_pacseq(path):
+                m, n = read_pacseq_header(path)   # header only; the step payload is never read
+                meta, steps = asdict(m), n
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                meta, steps = data.get("meta", {}) or {}, len(data.get("steps", []))
+            entry["meta"] = {k: meta.get(k, 0 if k in ("inter_delay_ms", "repeats") else "") for k in META_FIELDS}
+            entry["steps"] = steps
+        except Exception as e:
+            entry["error"] = str(e) or type(e).__name__
+        return entry
+
+    def refresh(self) -> bool:
+        """Sync with the folder; returns True if anything was added, changed or removed."""
+        if not self._loaded: self.load()
+        changed = False
+        seen = set()
+        try:
+            it = os.scandir(self.seq_dir)
+        except OSError:
+            it = None
+        if it is not None:
+            with it:
+                for e in it:
+                    if not e.name.lower().endswith(SEQUENCE_EXTS) or not e.is_file(): continue
+                    seen.add(e.name)
+                    try: st = e.stat()
+                    except OSError: continue
+                    cur = self.entries.get(e.name)
+                    if cur and cur.get("mtime_ns") == st.st_mtime_ns and cur.get("size") == st.st_size:
+                        continue
+                    self.entries[e.name] = self.parse_file(e.path, st.st_mtime_ns, st.st_size)
+                    changed = True
+        for fn in [fn for fn in self.entries if fn not in seen]:
+            del self.entries[fn]; changed = True
+        if changed: self.save()
+        return changed
+
+    def update(self, names) -> dict:
+        """Re-check just these files; returns {file name: new entry, or None if gone} for the ones
+           that were added, changed or removed."""
+        if not self._loaded: self.load()
+        out = {}
+        for fn in names:
+            p = os.path.join(self.seq_dir, fn)
+            try: st = os.stat(p) if os.path.isfile(p) else None
+            except OSError: st = None
+            cur = self.entries.get(fn)
+            if st is None:
+                if cur is not None: del self.entries[fn]; out[fn] = None
+                continue
+            if cur and cur.get("mtime_ns") == st.st_mtime_ns and cur.get("size") == st.st_size: continue
+            self.entries[fn] = out[fn] = self.parse_file(p, st.st_mtime_ns, st.st_size)
+        if out: self.save()
+        return out
+
+    def rows(self) -> List[Tuple[str, dict]]:
+        """(file name, entry) for every parseable file, sorted by file name."""
+        return [(fn, e) for fn, e in sorted(self.entries.items()) if "error" not in e]
+
+# ---------- Sequence libraries ----------
+# Bulk work over a whole sequences folder: validate, pack into / unpack from one .zip, convert
+# every file to a format. Per-file work (parse, validate, convert, decompress) runs on a
+# process pool; the parent only assigns names (unique_path, so collisions resolve exactly like
+# Save does) and writes the archive. Small batches run inline, where a pool's start-up would
+# cost more than it saves. Every op returns a report with files/s.
+LIBRARY_INLINE_MAX = 32
+LIBRARY_ARCHIVE_EXT = ".zip"
+
+def validate_sequence_bytes(name: str, data) -> Tuple[List[str], int]:
+    """(problems, step count) for a sequence file's content; the format comes from name."""
+    try:
+        if is_pacseq(name):
+            mv = memoryview(data)
+            meta, n, off = _pacseq_parse_head(mv)
+            if len(mv) < off + n * _PACSEQ_STEP.size: return ["truncated .pacseq payload"], 0
+            nb = len(SEQUENCE_BUTTONS)
+            for i, (_x, _y, _d, b) in enumerate(_PACSEQ_STEP.iter_unpack(mv[off:off + n * _PACSEQ_STEP.size])):
+                if b >= nb: return [f"step {i}: unknown button code {b}"], n
+            return [], n
+        doc = json.loads(bytes(data).decode("utf-8"))
+        steps = doc.get("steps") if isinstance(doc, dict) else None
+        return validate_sequence_data(doc), len(steps) if isinstance(steps, list) else 0
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        return [str(e) or type(e).__name__], 0
+
+def validate_sequence_file(path: str) -> Tuple[List[str], int]:
+    try:
+        with open(path, "rb") as f: data = f.read()
+    except OSError as e:
+        return [str(e)], 0
+    return validate_sequence_bytes(path, data)
+
+def library_files(folder: str) -> List[str]:
+    """Sequence files in folder (not the _last_sequence snapshot), sorted."""
+    try: names = sorted(os.listdir(folder))
+    except OSError: return []
+    return [os.path.join(folder, fn) for fn in names
+            if fn.lower().endswith(SEQUENCE_EXTS) and not fn.startswith("_last_sequence")
+            and os.path.isfile(os.path.join(folder, fn))]
+
+def _pool_imap(fn, items: list, jobs: Optional[int] = None):
+    """fn over items in order: inline for small batches, jobs=1 or a single CPU, else a spawn
+       process pool."""
+    if jobs == 1 or len(items) < LIBRARY_INLINE_MAX or (jobs is None and (os.cpu_count() or 1) < 2):
+        yield from map(fn, items); return
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+    n = max(1, min(jobs or os.cpu_count() or 1, len(items)))
+    with ProcessPoolExecutor(n, mp_context=mp.get_context("spawn")) as ex:
+        yield from ex.map(fn, items, chunksize=max(1, len(items) // (n * 8)))
+
+def _lib_validate(path: str):
+    return (path, *validate_sequence_file(path))
+
+def _lib_read_valid(path: str):
+    try:
+        with open(path, "rb") as f: data = f.read()
+    except OSError as e:
+        return path, [str(e)], None
+    errs, _ = validate_sequence_bytes(path, data)
+    return path, errs, None if errs else data
+
+def _lib_extract(job):
+    """Validate and write a batch of archive members; one archive open per batch."""
+    import zipfile
+    archive, pairs = job
+    out = []
+    with zipfile.ZipFile(archive) as z:
+        for member, dst in pairs:
+            try:
+                data = z.read(member)
+                errs, _ = validate_sequence_bytes(member, data)
+                if not errs: atomic_write(dst, data)
+            except Exception as e:
+                errs = [str(e) or type(e).__name__]
+            out.append((member, dst, errs))
+    return out
+
+def _lib_convert(job):
+    src, dst = job
+    try:
+        meta, steps = load_sequence_file(src)
+        save_sequence_file(dst, meta, steps)
+        return src, dst, []
+    except Exception as e:
+        return src, dst, [str(e) or type(e).__name__]
+
+def _library_report(op: str, t0: float, results) -> dict:
+    """results: (name, errs) pairs."""
+    failed = {os.path.basename(name): errs for name, errs in results if errs}
+    n, secs = len(results), time.perf_counter() - t0
+    return {"op": op, "files": n, "ok": n - len(failed), "failed": failed,
+            "secs": round(secs, 3), "files_per_s": round(n / secs, 1) if secs > 0 else None}
+
+def validate_library(paths: List[str], jobs: Optional[int] = None) -> dict:
+    t0 = time.perf_counter()
+    res = list(_pool_imap(_lib_validate, list(paths), jobs))
+    r = _library_report("validate", t0, [(p, e) for p, e, _ in res])
+    r["steps"] = sum(n for _, e, n in res if not e)
+    return r
+
+def pack_library(folder: str, archive: str, jobs: Optional[int] = None) -> dict:
+    """Every valid sequence file of folder into one .zip (written atomically); invalid files
+       are left out and reported."""
+    import zipfile
+    t0 = time.perf_counter()
+    results = []
+    tmp = f"{archive}.{os.getpid()}.{threading.get_ident()}.tmp"   # same naming/guarantees as atomic_write
+    try:
+        with open(tmp, "wb") as f:
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as z:
+                for path, errs, data in _pool_imap(_lib_read_valid, library_files(folder), jobs):
+                    if data is not None: z.writestr(os.path.basename(path), data)
+                    results.append((path, errs))
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, archive)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    r = _library_report("pack", t0, results)
+    r["archive"], r["bytes"] = archive, os.path.getsize(archive)
+    return r
+
+def unpack_library(archive: str, folder: str, jobs: Optional[int] = None) -> dict:
+    """Valid members of archive into folder; a name already taken gets " (2)", " (3)", ...
+       like Save. Invalid members are not written."""
+    import zipfile
+    t0 = time.perf_counter()
+    with zipfile.ZipFile(archive) as z:
+        members = [m for m in z.namelist() if not m.endswith("/")]
+    pairs, results, taken = [], [], set()
+    for m in members:
+        base, ext = os.path.splitext(os.path.basename(m))   # never a path from the archive
+        if ext.lower() not in SEQUENCE_EXTS:
+            results.append((m, ["not a sequence file"])); continue
+        dst = unique_path(folder, base, ext.lower(), taken); taken.add(dst)
+        pairs.append((m, dst))
+    n = max(1, min(jobs or os.cpu_count() or 1, len(pairs)))
+    size = max(1, -(-len(pairs) // (n * 4)))
+    batches = [(archive, pairs[i:i + size]) for i in range(0, len(pairs), size)]
+    written = []
+    for batch in _pool_imap(_lib_extract, batches, 1 if len(pairs) < LIBRARY_INLINE_MAX else jobs):   # batches, not files
+        for m, dst, errs in batch:
+            results.append((m, errs))
+            if not errs: written.append(os.path.basename(dst))
+    r = _library_report("unpack", t0, results)
+    r["written"] = written
+    return r
+
+def convert_library(folder: str, fmt: str, dst_dir: Optional[str] = None, jobs: Optional[int] = None) -> dict:
+    """Write every sequence file of folder that isn't in fmt ("json"/"pacseq") as fmt into
+       dst_dir (default: folder) under a free name; sources are kept."""
+    if fmt not in SEQUENCE_FORMATS: raise ValueError(f"unknown format {fmt!r}")
+    t0 = time.perf_counter()
+    ext = PACSEQ_EXT if fmt == "pacseq" else ".json"
+    dst_dir = dst_dir or folder
+    jobs_, taken = [], set()
+    for src in library_files(folder):
+        if src.lower().endswith(ext): continue
+        dst = unique_path(dst_dir, os.path.splitext(os.path.basename(src))[0], ext, taken); taken.add(dst)
+        jobs_.append((src, dst))
+    res = list(_pool_imap(_lib_convert, jobs_, jobs))
+    r = _library_report("convert", t0, [(src, e) for src, _, e in res])
+    r["written"] = [os.path.basename(d) for _, d, e in res if not e]
+    return r
+
+def library_report_text(r: dict, limit: int = 20) -> str:
+    lines = [f"{r['op']}: {r['ok']}/{r['files']} file(s) OK in {r['secs']}s ({r['files_per_s'] or '-'} files/s)"]
+    if "archive" in r: lines.append(f"archive {r['archive']} ({r['bytes']} bytes)")
+    for i, (fn, errs) in enumerate(sorted(r["failed"].items())):
+        if i == limit: lines.append(f"... and {len(r['failed']) - limit} more"); break
+        lines.append(f"  {fn}: {'; '.join(errs[:3])}")
+    return "\n".join(lines)
+
+# ---------- Sequence search ----------
+# Token index over name/site/slot/date/notes/file with prefix matching. Every query term must
+# prefix-match some token of a row; rows are ranked by field weight (name first), with exact
+# token matches scoring double. Runs on SequenceSearchWorker, off the Tk thread.
+_TOKEN_RE = re.compile(r"\w+")
+SEARCH_FIELD_WEIGHTS = (8, 4, 4, 2, 1, 3)  # name, site, slot, date, notes, file
+
+def manager_row(fn: str, entry: dict) -> tuple:
+    m = entry["meta"]
+    return (m["name"], m["site"], m["slot"], m["date"], m["notes"],
+            m["inter_delay_ms"], m["repeats"], entry["steps"], fn, "Dry Run")
+
+class SequenceSearch:
+    def __init__(self, rows: List[Tuple[str, tuple]]):
+        self.rows = dict(rows)             # file name -> manager row values
+        self.order = [fn for fn, _ in rows]
+        postings: dict = {}
+        for fn, vals in rows:
+            for tok, w in self._weighted_tokens(fn, vals):
+                d = postings.setdefault(tok, {})
+                if d.get(fn, 0) < w: d[fn] = w
+        self.postings = postings
+        self.tokens = sorted(postings)
+
+    @staticmethod
+    def _weighted_tokens(fn: str, vals: tuple):
+        for w, text in zip(SEARCH_FIELD_WEIGHTS, (*vals[:5], fn)):
+            for tok in _TOKEN_RE.findall(str(text).lower()):
+                yield tok, w
+
+    def put(self, fn: str, vals: tuple):
+        """Add or replace one row in place (order stays sorted by file name)."""
+        self.drop(fn)
+        self.rows[fn] = vals
+        bisect.insort(self.order, fn)
+        for tok, w in self._weighted_tokens(fn, vals):
+            d = self.postings.get(tok)
+            if d is None:
+                d = self.postings[tok] = {}; bisect.insort(self.tokens, tok)
+            if d.get(fn, 0) < w: d[fn] = w
+
+    def drop(self, fn: str):
+        vals = self.rows.pop(fn, None)
+        if vals is None: return
+        i = bisect.bisect_left(self.order, fn)
+        if i < len(self.order) and self.order[i] == fn: del self.order[i]
+        for tok, _w in self._weighted_tokens(fn, vals):
+            d = self.postings.get(tok)
+            if d is None or d.pop(fn, None) is None or d: continue
+            del self.postings[tok]
+            del self.tokens[bisect.bisect_left(self.tokens, tok)]
+
+    def query(self, q: str, cancelled=lambda: False) -> Optional[List[str]]:
+        """Ranked file names for q (all rows for an empty query); None if cancelled midway."""
+        terms = _TOKEN_RE.findall((q or "").lower())
+        if not terms: return list(self.order)
+        toks, postings = self.tokens, self.postings
+        scores: Optional[dict] = None
+        for term in terms:
+            if cancelled(): return None
+            hit: dict = {}
+            i = bisect.bisect_left(toks, term)
+            while i < len(toks) and toks[i].startswith(term):
+                tok = toks[i]; mul = 2 if tok == term else 1
+                for fn, w in postings[tok].items():
+                    if hit.get(fn, 0) < w * mul: hit[fn] = w * mul
+                i += 1
+            scores = hit if scores is None else {fn: scores[fn] + sc for fn, sc in hit.items() if fn in scores}
+            if not scores: return []
+        return sorted(scores, key=lambda fn: (-scores[fn], fn))
+
+class SequenceSearchWorker:
+    """Background thread owning the SequenceIndex and SequenceSearch. submit() replaces any
+       pending query (stale ones are cancelled mid-scan); on_results(gen, names, rows) is called
+       from the worker thread and must hop to Tk itself. notify(names) re-checks just those files
+       and, unless a query is pending anyway, reports on_changes(gen, [(file name, row values or
+       None, rank in the current results or None), ...]) for the rows that changed."""
+    def __init__(self, index: "SequenceIndex", on_results, on_changes=None):
+        self.index = index
+        self.on_results = on_results
+        self.on_changes = on_changes
+        self.search = SequenceSearch([])
+        self.gen = 0
+        self._cv = threading.Condition()
+        self._query: Optional[str] = None
+        self._text = ""                  # query behind the rows currently shown
+        self._refresh = False
+        self._changed: set = set()
+        self._stopped = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, query: str, refresh: bool = False) -> int:
+        with self._cv:
+            self.gen += 1
+            self._query = self._text = query
+            self._refresh = self._refresh or refresh
+            self._cv.notify()
+            return self.gen
+
+    def notify(self, names):
+        with self._cv:
+            self._changed.update(names)
+            self._cv.notify()
+
+    def stop(self):
+        with self._cv:
+            self._stopped = True
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while self._query is None and not self._changed and not self._stopped:
+                    self._cv.wait()
+                if self._stopped: return
+                gen, query, text, refresh, changed = self.gen, self._query, self._text, self._refresh, self._changed
+                self._query = None; self._refresh = False; self._changed = set()
+            if refresh:
+                try: self.index.refresh()
+                except Exception: pass
+                self.search = SequenceSearch([(fn, manager_row(fn, e)) for fn, e in self.index.rows()])
+            elif changed:
+                self._apply(changed, gen, text, report=query is None)
+            if query is None: continue
+            search = self.search
+            names = search.query(query, cancelled=lambda: gen != self.gen)
+            if names is not None and gen == self.gen:
+                self.on_results(gen, names, search.rows)
+
+    def _apply(self, names, gen: int, text: str, report: bool):
+        try: entries = self.index.update(names)
+        except Exception: return
+        rows = {}
+        for fn, e in entries.items():
+            if e is None or "error" in e:
+                self.search.drop(fn); rows[fn] = None
+            else:
+                rows[fn] = manager_row(fn, e); self.search.put(fn, rows[fn])
+        if not (rows and report and self.on_changes): return
+        ranked = self.search.query(text, cancelled=lambda: gen != self.gen)
+        if ranked is None or gen != self.gen: return   # a newer query will redraw everything
+        rank = {fn: i for i, fn in enumerate(ranked) if fn in rows}
+        self.on_changes(gen, [(fn, vals, rank.get(fn)) for fn, vals in rows.items()])
+
+# ---------- Sequence folder watcher ----------
+# Keeps the Sequences manager in step with the folder without rescans, including files dropped in
+# by other tools or sync jobs: inotify on Linux, an mtime/size poll elsewhere (or if inotify is
+# unavailable / the folder goes away). Bursts are debounced and resolved against each file's last
+# seen (mtime_ns, size), so a write that touches a file many times arrives as one "modify" and a
+# temp-file-then-rename save (atomic_write) as one "add"/"modify".
+WATCH_EVENTS = ("add", "modify", "remove")
+WATCH_DEBOUNCE_MS = 200     # quiet time before a burst is delivered...
+WATCH_MAX_DELAY_MS = 1000   # ...but a continuous burst is never held longer than this
+WATCH_POLL_S = 1.0
+
+_IN_MODIFY, _IN_CLOSE_WRITE, _IN_MOVED_FROM, _IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+_IN_CREATE, _IN_DELETE, _IN_DELETE_SELF, _IN_MOVE_SELF = 0x100, 0x200, 0x400, 0x800
+_IN_Q_OVERFLOW, _IN_IGNORED = 0x4000, 0x8000
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+                  | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_IN_EVENT = struct.Struct("iIII")   # wd, mask, cookie, len (name follows, NUL-padded)
+
+def _inotify_watch(folder: str) -> int:
+    """Non-blocking inotify fd watching folder, or -1 where inotify isn't available."""
+    if not sys.platform.startswith("linux"): return -1
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0: return -1
+        if libc.inotify_add_watch(fd, os.fsencode(folder), _IN_WATCH_MASK) < 0:
+            os.close(fd); return -1
+        return fd
+    except Exception:
+        return -1
+
+class SequenceWatcher:
+    """Thread calling on_events([(kind, file name), ...]) with kind in WATCH_EVENTS, from the
+       watcher thread. Only sequence files are reported. backend is "inotify" or "poll"."""
+    def __init__(self, folder: str, on_events, debounce_ms: int = WATCH_DEBOUNCE_MS,
+                 poll_s: float = WATCH_POLL_S, use_inotify: bool = True):
+        self.folder = folder
+        self.on_events = on_events
+        self.debounce = debounce_ms / 1000
+        self.poll_s = poll_s
+        self._fd = _inotify_watch(folder) if use_inotify else -1   # watch first, then snapshot: nothing slips between
+        self.backend = "inotify" if self._fd >= 0 else "poll"
+        self.known = self._scan()          # file name -> (mtime_ns, size)
+        self.batches = self.events = 0
+        self._stop = threading.Event()
+        self._wake = os.pipe() if self._fd >= 0 else None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._wake:
+            try: os.write(self._wake[1], b"x")
+            except OSError: pass
+
+    # ----- state -----
+    def _scan(self) -> dict:
+        out = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for e in it:
+                    if not e.name.lower().endswith(SEQUENCE_EXTS): continue
+                    try:
+                        if e.is_file(): st = e.stat(); out[e.name] = (st.st_mtime_ns, st.st_size)
+                    except OSError: pass
+        except OSError: pass
+        return out
+
+    def _diff(self, cur: dict) -> list:
+        old, self.known = self.known, cur
+        ev = [("remove", fn) for fn in old if fn not in cur]
+        ev += [("add" if fn not in old else "modify", fn) for fn, sig in cur.items() if old.get(fn) != sig]
+        return ev
+
+    def _resolve(self, names) -> list:
+        ev = []
+        for fn in sorted(names):
+            p = os.path.join(self.folder, fn)
+            try: st = os.stat(p) if os.path.isfile(p) else None
+            except OSError: st = None
+            sig, old = (st.st_mtime_ns, st.st_size) if st else None, self.known.get(fn)
+            if sig == old: continue
+            if sig is None: del self.known[fn]; ev.append(("remove", fn))
+            else: self.known[fn] = sig; ev.append(("modify" if old else "add", fn))
+        return ev
+
+    def _emit(self, ev: list):
+        if not ev: return
+        self.batches += 1; self.events += len(ev)
+        try: self.on_events(ev)
+        except Exception: pass
+
+    # ----- backends -----
+    def _run(self):
+        try:
+            if self._fd >= 0 and self._run_inotify():
+                return
+            while not self._stop.wait(self.poll_s):
+                self._emit(self._diff(self._scan()))
+        finally:
+            for fd in (self._fd, *(self._wake or ())):
+                if fd >= 0:
+                    try: os.close(fd)
+                    except OSError: pass
+
+    def _run_inotify(self) -> bool:
+        """True once stopped; False if the folder itself went away (the caller falls back to polling)."""
+        import select
+        dirty: set = set()
+        full = False
+        first = last = 0.0
+        while True:
+            timeout = None
+            if dirty or full:
+                timeout = max(0.0, min(last + self.debounce, first + WATCH_MAX_DELAY_MS / 1000) - time.monotonic())
+            r, _, _ = select.select([self._fd, self._wake[0]], [], [], timeout)
+            if self._stop.is_set(): return True
+            gone = False
+            if self._fd in r:
+                try: data = os.read(self._fd, 1 << 16)
+                except BlockingIOError: data = b""
+                now = time.monotonic()
+                if not (dirty or full): first = now
+                last = now
+                off = 0
+                while off + _IN_EVENT.size <= len(data):
+                    _wd, mask, _cookie, n = _IN_EVENT.unpack_from(data, off)
+                    name = data[off + _IN_EVENT.size:off + _IN_EVENT.size + n].rstrip(b"\0")
+                    off += _IN_EVENT.size + n
+                    if mask & _IN_Q_OVERFLOW: full = True
+                    elif mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF): gone = True
+                    elif name:
+                        fn = os.fsdecode(name)
+                        if fn.lower().endswith(SEQUENCE_EXTS): dirty.add(fn)
+            if gone:
+                self._emit(self._diff(self._scan()))
+                self.backend = "poll"
+                return False
+            if (dirty or full) and time.monotonic() >= min(last + self.debounce, first + WATCH_MAX_DELAY_MS / 1000):
+                self._emit(self._diff(self._scan()) if full else self._resolve(dirty))
+                dirty = set(); full = False
+
+# ---------- Input backends ----------
+# The click engine, the recorder and manual point capture all talk to an InputBackend instead
+# of pynput directly. Listener callbacks receive plain names ("left", "ctrl", ...), and buttons
+# are resolved to backend tokens once per run via button(), keeping lookups off the hot path.
+class InputBackend:
+    def position(self) -> Tuple[int,int]: raise NotImplementedError
+    def move(self, x:int, y:int): raise NotImplementedError
+    def button(self, name:str): return name
+    def click_at(self, x:int, y:int, button, count:int=1): raise NotImplementedError
+    def listen(self, on_click=None, on_press=None, on_release=None, on_move=None):
+        """Start listeners; on_click(x, y, button_name, pressed), on_press/on_release(key_name),
+           on_move(x, y). Returns a handle with stop()."""
+        raise NotImplementedError
+    def hotkeys(self, combos: dict):
+        """Start global hotkeys ({combo: callback}, pynput combo syntax). Returns a handle with stop()."""
+        raise NotImplementedError
+
+class _ListenerGroup:
+    def __init__(self, listeners): self.listeners = listeners
+    def stop(self):
+        for l in self.listeners:
+            try: l.stop()
+            except Exception: pass
+
+class PynputBackend(InputBackend):
+    def __init__(self):
+        self._mouse = mouse.Controller()
+        B = mouse.Button
+        self._buttons = {"left": B.left, "right": B.right, "middle": B.middle}
+        self._names = {v: k for k, v in self._buttons.items()}
+        K = keyboard.Key
+        self._ctrl = (K.ctrl, K.ctrl_l, K.ctrl_r)
+
+    def position(self):
+        x, y = self._mouse.position
+        return int(x), int(y)
+
+    def move(self, x, y): self._mouse.position = (x, y)
+
+    def button(self, name): return self._buttons.get(name, self._buttons["left"])
+
+    def click_at(self, x, y, button, count=1):
+        m = self._mouse
+        m.position = (x, y)
+        m.click(button, count)
+
+    def _key_name(self, key) -> str:
+        if key in self._ctrl: return "ctrl"
+        return getattr(key, "char", None) or getattr(key, "name", None) or str(key)
+
+    def listen(self, on_click=None, on_press=None, on_release=None, on_move=None):
+        ls = []
+        if on_click or on_move:
+            names = self._names
+            ls.append(mouse.Listener(
+                on_click=(lambda x, y, b, p: on_click(int(x), int(y), names.get(b, "middle"), p)) if on_click else None,
+                on_move=(lambda x, y: on_move(int(x), int(y))) if on_move else None))
+        if on_press or on_release:
+            kn = self._key_name
+            ls.append(keyboard.Listener(
+                on_press=(lambda k: on_press(kn(k))) if on_press else None,
+                on_release=(lambda k: on_release(kn(k))) if on_release else None))
+        for l in ls: l.start()
+        return _ListenerGroup(ls)
+
+    def hotkeys(self, combos):
+        l = keyboard.GlobalHotKeys(combos); l.start()
+        return l
+
+class FakeBackend(InputBackend):
+    """In-memory backend for headless runs. Every emitted event is appended to `events` as
+       (perf_counter_ns, kind, x, y, button, count); inject_* simulate user input for listeners."""
+    def __init__(self, position: Tuple[int,int] = (0, 0)):
+        self.pos = (int(position[0]), int(position[1]))
+        self.events: List[tuple] = []
+        self._listeners: List["_FakeListener"] = []
+        self.hotkey_combos: dict = {}
+
+    def position(self): return self.pos
+
+    def move(self, x, y):
+        self.pos = (x, y)
+        self.events.append((time.perf_counter_ns(), "move", x, y, "", 0))
+
+    def click_at(self, x, y, button, count=1):
+        self.pos = (x, y)
+        self.events.append((time.perf_counter_ns(), "click", x, y, button, count))
+
+    def listen(self, on_click=None, on_press=None, on_release=None, on_move=None):
+        h = _FakeListener(self, on_click, on_press, on_release, on_move)
+        self._listeners.append(h)
+        return h
+
+    def hotkeys(self, combos):
+        self.hotkey_combos = dict(combos)
+        return _FakeHotkeys(self)
+
+    def inject_hotkey(self, combo:str):
+        fn = self.hotkey_combos.get(combo)
+        if fn: fn()
+
+    def inject_click(self, x:int, y:int, button:str="left", pressed:bool=True):
+        for h in list(self._listeners):
+            if h.on_click: h.on_click(int(x), int(y), button, pressed)
+
+    def inject_move(self, x:int, y:int):
+        for h in self._listeners:
+            if h.on_move: h.on_move(x, y)
+
+    def inject_key(self, name:str, pressed:bool=True):
+        for h in list(self._listeners):
+            cb = h.on_press if pressed else h.on_release
+            if cb: cb(name)
+
+    def click_times_ns(self) -> List[int]:
+        return [e[0] for e in self.events if e[1] == "click"]
+
+class _FakeListener:
+    def __init__(self, backend, on_click, on_press, on_release, on_move=None):
+        self.backend, self.on_click, self.on_press, self.on_release = backend, on_click, on_press, on_release
+        self.on_move = on_move
+    def stop(self):
+        try: self.backend._listeners.remove(self)
+        except ValueError: pass
+
+class _FakeHotkeys:
+    def __init__(self, backend): self.backend = backend
+    def stop(self): self.backend.hotkey_combos = {}
+
+# ---------- Motion capture ----------
+# Recorder motion mode: the listener thread writes (ns, x, y, kind) into preallocated arrays
+# used as a ring (no allocation, locking or Tk work per event). finish() turns the ring into
+# Steps: clicks are kept as-is and each run of moves between them is simplified with
+# Ramer-Douglas-Peucker, so replayable paths stay compact.
+MOTION_MOVE = SEQUENCE_BUTTONS.index("move")
+MOTION_CODES = {b: i for i, b in enumerate(SEQUENCE_BUTTONS)}   # event kind = index into SEQUENCE_BUTTONS
+
+def simplify_path(xs, ys, tol: float) -> List[int]:
+    """Ramer-Douglas-Peucker: indices of the points to keep (always the first and last)."""
+    n = len(xs)
+    if n < 3 or tol <= 0: return list(range(n))
+    keep = bytearray(n); keep[0] = keep[n-1] = 1
+    tol2 = tol * tol
+    np = _numpy() if n > 512 else None
+    if np is not None: ax, ay = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2: continue
+        x0, y0, dx, dy = xs[a], ys[a], xs[b] - xs[a], ys[b] - ys[a]
+        L2 = dx * dx + dy * dy
+        if np is not None and b - a > 64:
+            px, py = ax[a+1:b] - x0, ay[a+1:b] - y0
+            d2 = (px * dy - py * dx) ** 2 / L2 if L2 else px * px + py * py
+            i = int(d2.argmax()); best, idx = float(d2[i]), a + 1 + i
+        else:
+            best, idx = -1.0, a
+            for i in range(a + 1, b):
+                px, py = xs[i] - x0, ys[i] - y0
+                d2 = (px * dy - py * dx) ** 2 / L2 if L2 else px * px + py * py
+                if d2 > best: best, idx = d2, i
+        if best > tol2:
+            keep[idx] = 1
+            stack.append((a, idx)); stack.append((idx, b))
+    return [i for i in range(n) if keep[i]]
+
+class MotionRecorder:
+    def __init__(self, capacity: int = 262144):
+        cap = 1 << (max(2, capacity) - 1).bit_length()
+        self.mask = cap - 1
+        self.t = array("q", bytes(8 * cap))
+        self.x = array("i", bytes(4 * cap))
+        self.y = array("i", bytes(4 * cap))
+        self.k = array("B", bytes(cap))
+        self.n = 0   # events written so far (older ones are overwritten once n > capacity)
+        self.manual: list = []   # (ns, x, y, kind) added from other threads; the ring has one writer
+
+    @property
+    def capacity(self) -> int: return self.mask + 1
+
+    @property
+    def dropped(self) -> int: return max(0, self.n - self.capacity)
+
+    def add(self, x: int, y: int, kind: int = MOTION_MOVE):
+        """Called from the listener thread for every event; kind is a MOTION_CODES value."""
+        i = self.n & self.mask
+        self.t[i] = time.perf_counter_ns(); self.x[i] = x; self.y[i] = y; self.k[i] = kind
+        self.n += 1
+
+    def add_manual(self, x: int, y: int, kind: int):
+        """A point added outside the listener (e.g. the Add point hotkey); merged in by time."""
+        self.manual.append((time.perf_counter_ns(), x, y, kind))
+
+    def events(self) -> List[Tuple[int,int,int,int]]:
+        """Retained events, oldest first, as (ns, x, y, kind)."""
+        cap, n = self.capacity, self.n
+        order = range(n) if n <= cap else range(n - cap, n)
+        m = self.mask
+        ev = [(self.t[i & m], self.x[i & m], self.y[i & m], self.k[i & m]) for i in order]
+        return list(heapq.merge(ev, self.manual)) if self.manual else ev
+
+    def to_steps(self, tolerance_px: float = 2) -> List[Step]:
+        """Clicks plus simplified moves; delay_ms is the recorded gap to the previous kept step.
+           Moves after the last click lead nowhere and are dropped."""
+        ev = self.events()
+        move = MOTION_MOVE
+        kept = []
+        seg = []   # run of move events since the last click
+        def flush():
+            if seg:
+                for i in simplify_path([e[1] for e in seg], [e[2] for e in seg], tolerance_px): kept.append(seg[i])
+                seg.clear()
+        for e in ev:
+            if e[3] == move: seg.append(e)
+            else: flush(); kept.append(e)
+        if not kept: flush()   # motion only: keep the path itself
+        steps, prev_ms = [], None
+        for t, x, y, k in kept:
+            ms = t // 1_000_000   # delays from absolute ms stamps: rounding never accumulates
+            steps.append(Step(x=x, y=y, delay_ms=0 if prev_ms is None else ms - prev_ms, button=SEQUENCE_BUTTONS[k]))
+            prev_ms = ms
+        return steps
+
+# ---------- Trajectories ----------
+# Smooth cursor glides between click targets. A path is the list of points after the start up to
+# and including the target, one per 1/move_rate_hz; its shape depends only on (from, to,
+# duration, curve), so paths live in an LRU and every pass after the first replays cached
+# points. warm() builds the missing paths of a whole plan in one batch (one NumPy expression when
+# available); the click loop only walks points and sleeps.
+MOVE_STYLES = ("off", "linear", "minjerk", "bezier")
+TRAJECTORY_CACHE_SIZE = 4096   # paths
+BEZIER_BOW = 0.12              # control-point offset, as a fraction of the distance
+
+def _ease(curve: str, n: int) -> List[float]:
+    """Progress 0..1 at each of the n points: constant speed or minimum-jerk (bell-shaped speed)."""
+    ts = [(i + 1) / n for i in range(n)]
+    if curve == "linear": return ts
+    return [t * t * t * (10 - 15 * t + 6 * t * t) for t in ts]
+
+def _bezier_controls(x0, y0, x1, y1) -> Tuple[float, float, float, float]:
+    """Control points at 1/3 and 2/3 of the chord, bowed to one side (chosen from the endpoints,
+       so the same move always curves the same way)."""
+    dx, dy = x1 - x0, y1 - y0
+    bow = BEZIER_BOW if (x0 + y0 + x1 + y1) & 1 else -BEZIER_BOW
+    px, py = -dy * bow, dx * bow
+    return x0 + dx / 3 + px, y0 + dy / 3 + py, x0 + 2 * dx / 3 + px, y0 + 2 * dy / 3 + py
+
+class TrajectoryCache:
+    def __init__(self, rate_hz: int = 125, size: int = TRAJECTORY_CACHE_SIZE):
+        self.rate_hz = max(1, int(rate_hz))
+        self.size = max(1, int(size))
+        self._lru: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._ease: dict = {}
+        self.hits = self.misses = 0
+
+    def points(self, duration_ms: int) -> int:
+        return max(1, duration_ms * self.rate_hz // 1000)
+
+    def path(self, x0: int, y0: int, x1: int, y1: int, duration_ms: int, curve: str) -> tuple:
+        """((x, y), ...) ending at (x1, y1); computed on a miss."""
+        key = (x0, y0, x1, y1, duration_ms, curve)
+        p = self._lru.get(key)
+        if p is not None:
+            self.hits += 1; self._lru.move_to_end(key); return p
+        self.misses += 1
+        return self._put(key, self._compute([key])[0])
+
+    def warm(self, keys) -> int:
+        """Build every missing path in keys ((x0, y0, x1, y1, duration_ms, curve) tuples) in
+           batches of one shape; returns how many were built."""
+        todo: dict = {}
+        for k in dict.fromkeys(keys):
+            if k not in self._lru: todo.setdefault(k[4:], []).append(k)
+        built = 0
+        for group in todo.values():
+            group = group[-self.size:]   # more than fit would only evict each other
+            for k, p in zip(group, self._compute(group)): self._put(k, p)
+            built += len(group)
+        return built
+
+    def _put(self, key, p):
+        self._lru[key] = p
+        if len(self._lru) > self.size: self._lru.popitem(last=False)
+        return p
+
+    def _compute(self, keys) -> List[tuple]:
+        """Paths for keys that share (duration_ms, curve)."""
+        dur, curve = keys[0][4], keys[0][5]
+        n = self.points(dur)
+        s = self._ease.get((curve, n))
+        if s is None: s = self._ease[(curve, n)] = _ease(curve, n)
+        np = _numpy()
+        if np is not None and len(keys) > 1:
+            e = np.array([k[:4] for k in keys], dtype=np.float64)          # (m, 4)
+            x0, y0, x1, y1 = e[:, 0:1], e[:, 1:2], e[:, 2:3], e[:, 3:4]
+            t = np.asarray(s)[None, :]                                      # (1, n)
+            if curve == "bezier":
+                c = np.array([_bezier_controls(*k[:4]) for k in keys])
+                u = 1 - t
+                b0, b1, b2, b3 = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+                xs = b0 * x0 + b1 * c[:, 0:1] + b2 * c[:, 2:3] + b3 * x1
+                ys = b0 * y0 + b1 * c[:, 1:2] + b2 * c[:, 3:4] + b3 * y1
+            else:
+                xs = x0 + (x1 - x0) * t; ys = y0 + (y1 - y0) * t
+            xs = np.rint(xs).astype(np.int64).tolist(); ys = np.rint(ys).astype(np.int64).tolist()
+            return [tuple(zip(xr, yr)) for xr, yr in zip(xs, ys)]
+        out = []
+        for x0, y0, x1, y1, _d, _c in keys:
+            if curve == "bezier":
+                cx1, cy1, cx2, cy2 = _bezier_controls(x0, y0, x1, y1)
+                pts = []
+                for t in s:
+                    u = 1 - t; b0, b1, b2, b3 = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+                    pts.append((round(b0 * x0 + b1 * cx1 + b2 * cx2 + b3 * x1),
+                                round(b0 * y0 + b1 * cy1 + b2 * cy2 + b3 * y1)))
+            else:
+                dx, dy = x1 - x0, y1 - y0
+                pts = [(round(x0 + dx * t), round(y0 + dy * t)) for t in s]
+            out.append(tuple(pts))
+        return out
+
+# ---------- Humanization ----------
+# Delay offsets and x/y jitter are sampled in batches (NumPy when available, `random`
+# otherwise) into ring buffers; the worker pulls one (offset, jx, jy) tuple per click and the
+# occasional refill happens before the deadline wait, so its cost is absorbed by the schedule.
+HUMANIZE_DISTS = ("uniform", "gaussian", "lognormal")
+HUMANIZE_BATCH = 4096
+
+class Humanizer:
+    def __init__(self, random_ms:int=0, jitter_px:int=0, dist:str="uniform", seed:Optional[int]=None,
+                 batch:int=HUMANIZE_BATCH):
+        self.random_ms = max(0, int(random_ms))
+        self.jitter_px = max(0, int(jitter_px))
+        self.dist = dist if dist in HUMANIZE_DISTS else "uniform"
+        self.batch = max(16, int(batch))
+        np = _numpy()
+        self._rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+        self._zero = not (self.random_ms or self.jitter_px)
+        self._ring: List[Tuple[int,int,int]] = []
+        self._i = 0
+        if not self._zero: self._refill()
+
+    @classmethod
+    def from_settings(cls, s: "Settings") -> "Humanizer":
+        return cls(s.random_ms, s.jitter_px, s.humanize_dist, s.humanize_seed if s.humanize_seed >= 0 else None)
+
+    def next(self) -> Tuple[int,int,int]:
+        """(delay offset ms, jitter x px, jitter y px) for the next click."""
+        if self._zero: return (0, 0, 0)
+        i = self._i
+        if i >= self.batch:
+            self._refill(); i = 0
+        self._i = i + 1
+        return self._ring[i]
+
+    def _refill(self):
+        n = self.batch
+        d = self._sample(n, self.random_ms)
+        jx = self._sample(n, self.jitter_px)
+        jy = self._sample(n, self.jitter_px)
+        self._ring = list(zip(d, jx, jy))
+        self._i = 0
+
+    def _sample(self, n:int, r:int) -> List[int]:
+        """n integer offsets in [-r, r]. uniform keeps the classic randint(-r, r) behaviour;
+           gaussian uses sigma=r/2; lognormal is right-skewed around 0 (late more often than early)."""
+        if r <= 0: return [0] * n
+        rng = self._rng; np = _numpy()
+        if np is not None:
+            if self.dist == "uniform":
+                a = rng.integers(-r, r + 1, n)
+            elif self.dist == "gaussian":
+                a = np.rint(rng.normal(0.0, r / 2.0, n))
+            else:
+                a = np.rint(r * (rng.lognormal(0.0, 0.5, n) - 1.0))
+            return np.clip(a, -r, r).astype(np.int64).tolist()
+        if self.dist == "uniform":
+            return [rng.randint(-r, r) for _ in range(n)]
+        if self.dist == "gaussian":
+            g = rng.gauss; h = r / 2.0
+            return [min(r, max(-r, round(g(0.0, h)))) for _ in range(n)]
+        ln = rng.lognormvariate
+        return [min(r, max(-r, round(r * (ln(0.0, 0.5) - 1.0)))) for _ in range(n)]
+
+# ---------- Timing ----------
+# Clicks are planned against absolute perf_counter_ns() deadlines: every wait advances the
+# previous *deadline* by the requested interval (never "now + interval"), so time spent in
+# do_click, pause checks and OS sleep overshoot is absorbed instead of accumulating as drift.
+SPIN_NS = 1_500_000        # final stretch before a deadline is spent yielding, not sleeping
+RESYNC_NS = 250_000_000    # further behind than this (system stall) -> re-anchor, don't burst
+# Condition waits time out at timer granularity on Windows (~15.6 ms), so the interruptible
+# coarse wait stops this far before the deadline and 1 ms sleeps cover the rest.
+WAIT_MARGIN_NS = 16_000_000 if IS_WINDOWS else 2_000_000
+
+class RunControl:
+    """Stop/pause state shared by the UI and a click run. Every wait is on one Condition, so
+       stop/resume wake the worker immediately, and a paused worker blocks with no timeout
+       (zero periodic wakeups). One instance per run, so a straggling worker stays stopped."""
+    def __init__(self):
+        self._cv = threading.Condition()
+        self.stopped = False
+        self.paused = False
+        self.woken = False   # wake(): cut the current wait short so the run re-plans
+
+    def wake(self):
+        with self._cv:
+            self.woken = True
+            self._cv.notify_all()
+
+    def stop(self):
+        with self._cv:
+            self.stopped = True
+            self.paused = False   # a stopped run is idle, not paused (the UI reads this until the next Start)
+            self._cv.notify_all()
+
+    def set_paused(self, paused: bool):
+        with self._cv:
+            self.paused = bool(paused) and not self.stopped
+            self._cv.notify_all()
+
+    def sleep(self, secs: float) -> bool:
+        """Sleep up to secs; returns False as soon as the run is stopped, paused or woken."""
+        with self._cv:
+            if self.stopped or self.paused or self.woken: return False
+            self._cv.wait(secs)
+            return not (self.stopped or self.paused or self.woken)
+
+    def clear_wake(self):
+        with self._cv: self.woken = False
+
+    def wait_woken(self):
+        """Block until wake(), pause or stop (an idle run with nothing due)."""
+        with self._cv:
+            while not (self.woken or self.paused or self.stopped):
+                self._cv.wait()
+
+    def wait_while_paused(self) -> int:
+        """Block until resumed or stopped; returns ns spent paused."""
+        t = time.perf_counter_ns()
+        with self._cv:
+            while self.paused and not self.stopped:
+                self._cv.wait()
+        return time.perf_counter_ns() - t
+
+class ClickScheduler:
+    def __init__(self, min_interval_ns: int = 0, control: Optional[RunControl] = None, metrics: Optional["RunMetrics"] = None):
+        self.min_interval_ns = max(0, int(min_interval_ns))  # max_cps safety cap between real clicks
+        self.control = control or RunControl()
+        self.metrics = metrics
+        self.deadline_ns: Optional[int] = None
+        self.last_click_ns: Optional[int] = None
+        # lateness report (ns, relative to each click's deadline)
+        self.clicks = 0
+        self.last_late_ns = 0
+        self.max_late_ns = 0
+        self.total_late_ns = 0
+
+    def rebase(self):
+        """Re-anchor the plan at 'now' (run start, after a pause)."""
+        self.deadline_ns = time.perf_counter_ns()
+
+    def wait(self, interval_s: float, click: bool = True) -> Optional[int]:
+        """Block until previous deadline + interval; returns how late we woke up (ns), or None
+           if the run was stopped. A pause during the wait re-plans the same interval after resume.
+           click=False (a recorded cursor move) skips the max_cps floor and the click bookkeeping."""
+        ctl = self.control
+        while True:
+            if ctl.paused:
+                paused_ns = ctl.wait_while_paused()
+                if self.metrics: self.metrics.pause_ns += paused_ns
+                self.rebase()  # resume on a fresh plan instead of bursting to catch up
+            if ctl.stopped: return None
+            now = time.perf_counter_ns()
+            if self.deadline_ns is None: self.deadline_ns = now
+            target = self.deadline_ns + int(interval_s * 1_000_000_000)
+            if click and self.last_click_ns is not None:
+                target = max(target, self.last_click_ns + self.min_interval_ns)
+            if now - target > RESYNC_NS: target = now
+            if self._sleep_until(target): break
+        if not click:
+            self.deadline_ns = target
+            return time.perf_counter_ns() - target
+        return self.mark(target)
+
+    def mark(self, target: int) -> int:
+        """Book a click that was due at target (ns) and is happening now; returns lateness (ns)."""
+        t = time.perf_counter_ns()
+        late = t - target
+        self.deadline_ns = target
+        self.last_click_ns = t
+        self.clicks += 1
+        self.last_late_ns = late
+        self.total_late_ns += late
+        if late > self.max_late_ns: self.max_late_ns = late
+        if self.metrics: self.metrics.record(late)
+        return late
+
+    def _sleep_until(self, target_ns: int) -> bool:
+        # interruptible coarse wait, then 1 ms sleeps, then yield until the deadline passes;
+        # returns False if stop/pause/wake arrived first (each stage notices within ~1 ms)
+        ctl = self.control
+        rem = target_ns - time.perf_counter_ns()
+        if rem > WAIT_MARGIN_NS and not ctl.sleep((rem - WAIT_MARGIN_NS) / 1_000_000_000):
+            return False
+        while True:
+            if ctl.stopped or ctl.paused or ctl.woken: return False
+            rem = target_ns - time.perf_counter_ns()
+            if rem <= 0: return True
+            if rem > SPIN_NS: time.sleep(min(rem - SPIN_NS, 1_000_000) / 1_000_000_000)
+            else: time.sleep(0)
+
+    def summary(self) -> str:
+        if not self.clicks: return "no clicks"
+        avg = self.total_late_ns / self.clicks / 1e6
+        return f"{self.clicks} click(s), late avg {avg:.3f} ms / max {self.max_late_ns/1e6:.3f} ms"
+
+# ---------- Runtime metrics ----------
+# Cheap per-run counters plus a fixed-bucket histogram of click lateness. record() is O(1) and
+# only bumps preallocated slots; everything derived (CPS, percentiles) is computed on read.
+LATE_BUCKETS_NS = (50_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000,
+                   5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000)
+DEADLINE_MISS_NS = 2_000_000   # a click later than this counts as a missed deadline
+METRICS_EXPORTS = ("off", "jsonl", "prom")
+
+class RunMetrics:
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.ended_ns = 0
+        self.clicks = 0
+        self.misses = 0
+        self.passes = 0
+        self.pause_ns = 0
+        self.late_sum_ns = 0
+        self.late_max_ns = 0
+        self.err_sum_ns = 0       # |actual interval - planned interval|, summed
+        self.err_max_ns = 0
+        self._prev_late = 0
+        self.buckets = [0] * (len(LATE_BUCKETS_NS) + 1)
+
+    def record(self, late_ns: int):
+        """One click, late_ns after its deadline. Interval error follows from consecutive lateness."""
+        self.clicks += 1
+        self.late_sum_ns += late_ns
+        if late_ns > self.late_max_ns: self.late_max_ns = late_ns
+        if late_ns > DEADLINE_MISS_NS: self.misses += 1
+        self.buckets[bisect.bisect_left(LATE_BUCKETS_NS, late_ns)] += 1
+        if self.clicks > 1:
+            err = late_ns - self._prev_late
+            if err < 0: err = -err
+            self.err_sum_ns += err
+            if err > self.err_max_ns: self.err_max_ns = err
+        self._prev_late = late_ns
+
+    def finish(self): self.ended_ns = time.perf_counter_ns()
+
+    def active_secs(self) -> float:
+        end = self.ended_ns or time.perf_counter_ns()
+        return max(0, end - self.started_ns - self.pause_ns) / 1e9
+
+    def cps(self) -> float:
+        t = self.active_secs()
+        return self.clicks / t if t > 0 else 0.0
+
+    def late_percentile_ms(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (ms)."""
+        if not self.clicks: return 0.0
+        need, acc = q * self.clicks, 0
+        for i, n in enumerate(self.buckets):
+            acc += n
+            if acc >= need:
+                return (LATE_BUCKETS_NS[i] if i < len(LATE_BUCKETS_NS) else self.late_max_ns) / 1e6
+        return self.late_max_ns / 1e6
+
+    def snapshot(self) -> dict:
+        n = max(1, self.clicks)
+        return {
+            "ts": time.time(), "clicks": self.clicks, "cps": round(self.cps(), 3), "passes": self.passes,
+            "deadline_misses": self.misses, "pause_s": round(self.pause_ns / 1e9, 3),
+            "late_avg_ms": round(self.late_sum_ns / n / 1e6, 4), "late_max_ms": round(self.late_max_ns / 1e6, 4),
+            "late_p50_ms": self.late_percentile_ms(0.5), "late_p99_ms": self.late_percentile_ms(0.99),
+            "interval_err_avg_ms": round(self.err_sum_ns / max(1, self.clicks - 1) / 1e6, 4),
+            "interval_err_max_ms": round(self.err_max_ns / 1e6, 4),
+        }
+
+    def short_text(self) -> str:
+        return f"{self.clicks} clicks · {self.cps():.1f} cps · p99 {self.late_percentile_ms(0.99):g} ms · miss {self.misses}"
+
+    def prometheus_text(self) -> str:
+        p = "pyautoclicker_"
+        lines = []
+        def metric(name, kind, help_, value):
+            lines.extend((f"# HELP {p}{name} {help_}", f"# TYPE {p}{name} {kind}", f"{p}{name} {value}"))
+        metric("clicks_total", "counter", "Clicks emitted in the current run.", self.clicks)
+        metric("achieved_cps", "gauge", "Clicks per second, excluding paused time.", round(self.cps(), 3))
+        metric("deadline_misses_total", "counter", f"Clicks later than {DEADLINE_MISS_NS/1e6:g} ms.", self.misses)
+        metric("pause_seconds_total", "counter", "Time spent paused.", round(self.pause_ns / 1e9, 3))
+        metric("passes_total", "counter", "Completed passes over the sequence.", self.passes)
+        metric("interval_error_seconds_max", "gauge", "Worst interval error.", self.err_max_ns / 1e9)
+        name = f"{p}click_lateness_seconds"
+        lines += [f"# HELP {name} Click lateness relative to its deadline.", f"# TYPE {name} histogram"]
+        acc = 0
+        for bound, n in zip(LATE_BUCKETS_NS, self.buckets):
+            acc += n
+            lines.append(f'{name}_bucket{{le="{bound/1e9:g}"}} {acc}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.clicks}')
+        lines.append(f"{name}_sum {self.late_sum_ns/1e9}")
+        lines.append(f"{name}_count {self.clicks}")
+        return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Writes RunMetrics every `secs` to CONFIG_DIR: metrics.jsonl (appended) or metrics.prom
+       (replaced atomically, for a node_exporter textfile collector)."""
+    def __init__(self, metrics: RunMetrics, kind: str, secs: int, config_dir: str = CONFIG_DIR):
+        self.metrics, self.kind, self.secs = metrics, kind, max(1, int(secs))
+        self.path = os.path.join(config_dir, "metrics.jsonl" if kind == "jsonl" else "metrics.prom")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while not self._stop.wait(self.secs):
+            self.write()
+        self.write()  # final numbers at the end of the run
+
+    def write(self):
+        try:
+            if self.kind == "jsonl":
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.metrics.snapshot()) + "\n")
+            else:
+                atomic_write(self.path, self.metrics.prometheus_text())
+        except Exception:
+            pass
+
+# ---------- Status store ----------
+# Observable UI state. Writers (Tk thread, click worker) call set()/touch(); subscribers (bubble,
+# tray) are called on the Tk thread with (state, changed_keys), coalesced to one flush per
+# frame. Nothing is scheduled while nothing changes, so an idle app has no UI wakeups.
+STATUS_FRAME_MS = 33
+
+class StatusStore:
+    def __init__(self, schedule):
+        self._schedule = schedule   # schedule(ms, fn) on the Tk thread, e.g. root.after
+        self.state = {"running": False, "paused": False, "dryrun": False, "profile": "", "counters": 0}
+        self._changed = set()
+        self._subs = []
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def subscribe(self, fn):
+        self._subs.append(fn)
+        fn(dict(self.state), set(self.state))   # initial render
+
+    def set(self, **kw):
+        with self._lock:
+            for k, v in kw.items():
+                if self.state.get(k) != v:
+                    self.state[k] = v
+                    self._changed.add(k)
+            if not self._changed or self._pending: return
+            self._pending = True
+        self._schedule(STATUS_FRAME_MS, self._flush)
+
+    def touch(self, key: str):
+        """Mark a derived key dirty (live counters, read by subscribers at flush time).
+           Lock-free for the click hot path: a set add and a flag check."""
+        self._changed.add(key)
+        if not self._pending:
+            self._pending = True
+            self._schedule(STATUS_FRAME_MS, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            self._pending = False
+            changed, self._changed = self._changed, set()
+            state = dict(self.state)
+        if not changed: return
+        for fn in self._subs:
+            try: fn(state, changed)
+            except Exception: pass
+
+# ---------- Hotkey dispatch ----------
+# Hotkey callbacks run on the listener thread and must return fast. Each one stamps the press,
+# runs its optional `direct` part right there (stop/pause: a RunControl call, so the click run
+# reacts without waiting for Tk) and appends the Tk part to a deque. The Tk loop drains the deque
+# in one scheduled callback per burst, like StatusStore. Press->action latency is kept per action
+# in a small ring for percentiles.
+HOTKEY_LATENCY_SAMPLES = 256
+
+class HotkeyDispatcher:
+    def __init__(self, schedule):
+        self._schedule = schedule   # schedule(ms, fn) on the Tk thread, e.g. root.after
+        self._q = deque()           # (name, t0_ns, fn); append/popleft are atomic, no lock needed
+        self._armed = False
+        self.latency: dict = {}     # action name -> deque of ns
+
+    def bind(self, name: str, action, direct=None):
+        """A hotkey callback. action runs on the Tk thread. direct, if given, runs first on the
+           listener thread; when it acts it returns the follow-up to run on Tk instead of action,
+           and None when it leaves the press to action."""
+        def fire():
+            t0 = time.perf_counter_ns()
+            follow = direct() if direct is not None else None
+            if follow is None:
+                self._q.append((name, t0, action))
+            else:
+                self._record(name, t0)
+                self._q.append((name + " (ui)", t0, follow))
+            if not self._armed:
+                self._armed = True
+                self._schedule(0, self._drain)
+        return fire
+
+    def _drain(self):
+        self._armed = False   # cleared first: a press landing mid-drain re-arms rather than waits
+        q = self._q
+        while q:
+            name, t0, fn = q.popleft()
+            try: fn()
+            finally: self._record(name, t0)
+
+    def _record(self, name: str, t0: int):
+        ring = self.latency.get(name)
+        if ring is None: ring = self.latency[name] = deque(maxlen=HOTKEY_LATENCY_SAMPLES)
+        ring.append(time.perf_counter_ns() - t0)
+
+    def stats(self) -> dict:
+        """{action: {"n", "p50_ms", "p90_ms", "p99_ms", "max_ms"}} over the recent presses."""
+        out = {}
+        for name, ring in list(self.latency.items()):
+            v = sorted(ring)
+            if not v: continue
+            pick = lambda q: round(v[min(len(v) - 1, int(q * len(v)))] / 1e6, 3)
+            out[name] = {"n": len(v), "p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99),
+                         "max_ms": round(v[-1] / 1e6, 3)}
+        return out
+
+    def summary(self) -> str:
+        st = self.stats()
+        if not st: return "no hotkey presses yet"
+        return "\n".join(f"{k}: p50 {d['p50_ms']} ms · p99 {d['p99_ms']} ms · max {d['max_ms']} ms (n={d['n']})"
+                         for k, d in sorted(st.items()))
+
+# ---------- Click engine ----------
+# One start->stop run of clicks, with no Tk dependency: the App drives it on its worker thread and
+# the CLI drives it directly. Humanizer, metrics and scheduler are built before run() so callers
+# can read them live; the run itself only walks a plan of pre-resolved tuples.
+REPLAY_SPEED_MIN_PCT, REPLAY_SPEED_MAX_PCT = 5, 10000   # replay_speed_pct range: 0.05x .. 100x
+
+class ReplayTiming:
+    """Speed factor and idle-gap cap shared by the engines. Plans keep the recorded delays; the
+       timing thread scales each one as it is scheduled, so set_timing() from another thread
+       takes effect from the next step."""
+    speed = 1.0; idle_cap_ms = 0
+    _k = 1.0; _cap = float("inf")
+
+    def set_timing(self, speed: Optional[float] = None, idle_cap_ms: Optional[int] = None):
+        if speed is not None:
+            self.speed = speed if speed > 0 else 1.0
+            self._k = 1.0 / self.speed
+        if idle_cap_ms is not None:
+            self.idle_cap_ms = max(0, int(idle_cap_ms))
+            self._cap = self.idle_cap_ms or float("inf")
+
+    def _init_timing(self, s: Settings, speed: Optional[float], idle_cap_ms: Optional[int]):
+        self.set_timing(s.replay_speed_pct / 100 if speed is None else speed,
+                        s.idle_gap_cap_ms if idle_cap_ms is None else idle_cap_ms)
+
+    def scaled_ms(self, delay_ms: float) -> float:
+        """A recorded delay as played: capped at the idle-gap limit, then divided by speed."""
+        return (delay_ms if delay_ms <= self._cap else self._cap) * self._k
+
+class ClickEngine(ReplayTiming):
+    def __init__(self, s: Settings, backend: InputBackend, control: Optional[RunControl] = None,
+                 touch=None, speed: Optional[float] = None, idle_cap_ms: Optional[int] = None,
+                 trajectories: Optional[TrajectoryCache] = None):
+        self.s = s
+        self.input = backend
+        self.control = control or RunControl()
+        self.touch = touch or (lambda _k: None)
+        self._init_timing(s, speed, idle_cap_ms)
+        self.glide = s.move_style if s.move_style != "off" and s.move_ms > 0 else None
+        if trajectories is None or trajectories.rate_hz != s.move_rate_hz:
+            trajectories = TrajectoryCache(s.move_rate_hz)
+        self.trajectories = trajectories   # pass the previous run's cache to reuse its paths
+        self.min_ms = int(1000/s.max_cps)
+        self.humanizer = Humanizer.from_settings(s)
+        self.metrics = RunMetrics()
+        self.scheduler = ClickScheduler(self.min_ms * 1_000_000, self.control, self.metrics)
+
+    def human_delay(self, base_ms:float, offset_ms:int=0)->float:
+        """base + pre-sampled random offset (see Humanizer), floored by max_cps; seconds."""
+        base_ms += offset_ms
+        base_ms = max(base_ms, self.min_ms)
+        return max(0, base_ms)/1000.0
+
+    def run(self, steps=None, meta: Optional[SequenceMeta] = None) -> RunMetrics:
+        """Click steps (repeats from meta, 0 = until stopped), or click at the cursor when there are
+           no steps. steps is a list or any re-iterable step source (see Step sources); a list is
+           pre-planned once, a source is streamed and re-iterated per pass. Returns when the run
+           completes or control is stopped."""
+        s, hz, ctl, m, touch = self.s, self.humanizer, self.control, self.metrics, self.touch
+        exporter = None
+        try:
+            inter = int(meta.inter_delay_ms) if meta and meta.inter_delay_ms>0 else None
+            repeats = int(meta.repeats) if meta and meta.repeats>0 else None
+            count = 2 if s.double_click else 1
+            click, move = self.input.click_at, self.input.move
+            exporter = MetricsExporter(m, s.metrics_export, s.metrics_export_secs).start() \
+                if s.metrics_export != "off" else None
+            sched = self.scheduler
+            sched.rebase()
+            if not steps:
+                left = self.input.button("left")
+                while not ctl.stopped:
+                    x,y=self.input.position()
+                    off,jx,jy=hz.next()
+                    click(x+jx,y+jy,left,count); touch("counters")
+                    if sched.wait(self.human_delay(s.base_interval_ms, off)) is None: break   # not a replay: speed doesn't apply
+            else:
+                if isinstance(steps, list):
+                    # resolve buttons/delays once; the loop below only reads tuples (delays unscaled)
+                    plan = [(st.x, st.y, st.delay_ms if st.button == "move" or inter is None else inter,
+                             None if st.button == "move" else self.input.button(st.button)) for st in steps]
+                else:
+                    plan = None   # streamed: a fresh pass over the source each time
+                glide, traj, gms = self.glide, self.trajectories, s.move_ms
+                cx, cy = self.input.position() if glide else (0, 0)   # where the cursor is now
+                if glide and plan is not None:   # every click-to-click path of the plan, in one batch
+                    pts = [(x, y) for x, y, _d, _b in plan]
+                    traj.warm([(*a, *b, gms, glide) for a, b in zip([(cx, cy)] + pts, pts) if a != b]
+                              + [(*pts[-1], *pts[0], gms, glide)])
+                passes_done=0
+                while not ctl.stopped:
+                    it = plan if plan is not None else self._stream(steps, inter); n = 0
+                    try:
+                        for x, y, delay, btn in it:
+                            n += 1
+                            delay = self.scaled_ms(delay)
+                            if btn is None:   # recorded motion: exact timing, no humanization or max_cps floor
+                                if sched.wait(delay / 1000.0, False) is None: break
+                                move(x, y); cx, cy = x, y; continue
+                            off,jx,jy=hz.next()
+                            iv = self.human_delay(delay, off)
+                            if glide and (x, y) != (cx, cy):
+                                iv = self._glide(traj.path(cx, cy, x, y, gms, glide), iv, jx, jy)
+                                if iv is None: break
+                            cx, cy = x, y
+                            if sched.wait(iv) is None: break
+                            click(x+jx, y+jy, btn, count); touch("counters")
+                        else:
+                            passes_done+=1
+                            m.passes = passes_done
+                    finally:
+                        if plan is None: it.close()   # release the source's file/mapping now
+                    if not n or (repeats is not None and passes_done>=repeats):
+                        break
+        finally:
+            m.finish()
+            if exporter: exporter.stop()
+        return m
+
+    def _glide(self, path: tuple, iv: float, jx: int, jy: int) -> Optional[float]:
+        """Move along path during the last move_ms of a click's interval (all of it if shorter);
+           returns the wait left before the click (on the final point), or None if stopped. The
+           click's pixel jitter is blended in along the way so the path ends where it clicks."""
+        sched, move, n = self.scheduler, self.input.move, len(path)
+        g = min(self.s.move_ms / 1000.0, iv)
+        dt = g / n
+        if sched.wait(iv - g, False) is None: return None
+        for i, (px, py) in enumerate(path[:-1]):
+            if sched.wait(dt, False) is None: return None
+            if jx or jy:
+                f = (i + 1) / n; px += round(jx * f); py += round(jy * f)
+            move(px, py)
+        return dt
+
+    def _stream(self, steps, inter: Optional[int]):
+        """One pass over a step source as plan tuples; buttons are resolved once per name."""
+        btns = {"move": None}; resolve = self.input.button
+        for x, y, d, b in step_rows(steps):
+            if b == "move":
+                yield x, y, d, None; continue
+            btn = btns.get(b)
+            if btn is None: btn = btns[b] = resolve(b)
+            yield x, y, inter if inter is not None else d, btn
+
+# ---------- Multi-sequence runs ----------
+# Several sequences interleaved on one timing thread. Each track keeps its own deadline chain
+# (repeats, inter-delay, pause); a heap of (due_ns, order, gen, track) picks the next click, so
+# ties always resolve in track order and a seeded run is reproducible. The max_cps budget is
+# split evenly: each active track is floored at active/max_cps between its clicks, and the
+# shared scheduler still enforces 1/max_cps between any two clicks.
+class SequenceTrack:
+    """One sequence in a MultiEngine. Steps come from a list or any step source and are pulled
+       one ahead (cur), so a streamed source is never materialised; each pass re-iterates it."""
+    def __init__(self, name: str, steps, meta: Optional[SequenceMeta], order: int):
+        self.name, self.order = name, order
+        meta = meta or SequenceMeta()
+        self.source = steps
+        self.inter = meta.inter_delay_ms if meta.inter_delay_ms > 0 else None
+        self.repeats = meta.repeats if meta.repeats > 0 else None
+        self.passes = 0; self.clicks = 0
+        self.cur = None; self._it = None   # cur: (x, y, delay_ms, button) of the next click, unscaled
+        self.paused = False; self.done = not self.next_pass()
+        self.due_ns = 0; self.gen = 0; self.left_ns = 0   # left_ns: time still to wait when paused
+
+    def next_pass(self) -> bool:
+        """Restart the source; False if it has no steps."""
+        if self._it is not None: self._it.close()
+        self._it = iter(step_rows(self.source))
+        return self.next_step()
+
+    def next_step(self) -> bool:
+        r = next(self._it, None)
+        if r is None:
+            self.cur = None; return False
+        x, y, d, b = r
+        self.cur = (x, y, self.inter if self.inter is not None and b != "move" else d, b)
+        return True
+
+    def close(self):
+        if self._it is not None:
+            self._it.close(); self._it = None
+
+class MultiEngine(ReplayTiming):
+    def __init__(self, s: Settings, backend: InputBackend, control: Optional[RunControl] = None,
+                 touch=None, speed: Optional[float] = None, idle_cap_ms: Optional[int] = None):
+        self.s = s
+        self.input = backend
+        self.control = control or RunControl()
+        self.touch = touch or (lambda _k: None)
+        self._init_timing(s, speed, idle_cap_ms)
+        self.gap_ns = int(1000/s.max_cps) * 1_000_000
+        self.humanizer = Humanizer.from_settings(s)
+        self.metrics = RunMetrics()
+        self.scheduler = ClickScheduler(self.gap_ns, self.control, self.metrics)
+        self.tracks: List[SequenceTrack] = []
+        self._heap: list = []
+        self._ops = deque()   # callables applied on the timing thread between clicks
+        self._buttons: dict = {}
+
+    # thread-safe controls (applied by the timing thread)
+    def add(self, name: str, steps, meta: Optional[SequenceMeta] = None) -> SequenceTrack:
+        tr = SequenceTrack(name, steps, meta, len(self.tracks))
+        self.tracks.append(tr)
+        self._post(lambda: self._start_track(tr, time.perf_counter_ns()))
+        return tr
+
+    def set_track_paused(self, name: str, paused: bool):
+        self._post(lambda: self._pause_track(name, paused))
+
+    def _post(self, fn):
+        self._ops.append(fn)
+        self.control.wake()
+
+    # timing thread
+    def _active(self) -> int:
+        return sum(1 for t in self.tracks if not (t.done or t.paused)) or 1
+
+    def _push(self, tr: SequenceTrack, due_ns: int):
+        tr.due_ns = due_ns; tr.gen += 1
+        heapq.heappush(self._heap, (due_ns, tr.order, tr.gen, tr))
+
+    def _start_track(self, tr: SequenceTrack, now: int):
+        if tr.done or tr.paused: return
+        self._push(tr, now + int(self.scaled_ms(tr.cur[2]) * 1_000_000))
+
+    def _pause_track(self, name: str, paused: bool):
+        now = time.perf_counter_ns()
+        for tr in self.tracks:
+            if tr.name != name or tr.done or tr.paused == paused: continue
+            tr.paused = paused
+            if paused:
+                tr.left_ns = max(0, tr.due_ns - now); tr.gen += 1   # drops its heap entry
+            else:
+                self._push(tr, now + tr.left_ns)
+
+    def _advance(self, tr: SequenceTrack, now: int, off_ms: int):
+        """Move tr to its next step and queue it; the delay is floored by its share of max_cps."""
+        if not tr.next_step():
+            tr.passes += 1
+            self.metrics.passes = sum(t.passes for t in self.tracks)
+            if (tr.repeats is not None and tr.passes >= tr.repeats) or not tr.next_pass():
+                tr.done = True; tr.close(); return
+        delay = self.scaled_ms(tr.cur[2])
+        if tr.cur[3] == "move":   # recorded motion keeps its own timing
+            due = tr.due_ns + int(delay * 1_000_000)
+        else:
+            delay_ns = int(max(0, delay + off_ms) * 1_000_000)
+            due = tr.due_ns + max(delay_ns, self._active() * self.gap_ns)
+        if now - due > RESYNC_NS: due = now   # starved or stalled: re-anchor, don't burst
+        self._push(tr, due)
+
+    def run(self) -> RunMetrics:
+        """Run every track until all finish or the run is stopped."""
+        ctl, sched, m, hz, heap = self.control, self.scheduler, self.metrics, self.humanizer, self._heap
+        count = 2 if self.s.double_click else 1
+        click, touch = self.input.click_at, self.touch
+        exporter = MetricsExporter(m, self.s.metrics_export, self.s.metrics_export_secs).start() \
+            if self.s.metrics_export != "off" else None
+        try:
+            while not ctl.stopped:
+                if ctl.paused:
+                    ns = ctl.wait_while_paused(); m.pause_ns += ns
+                    for tr in self.tracks:   # the whole plan slides by the pause
+                        if not (tr.done or tr.paused): self._push(tr, tr.due_ns + ns)
+                    continue
+                if ctl.woken or self._ops:
+                    ctl.clear_wake()
+                    while self._ops: self._ops.popleft()()
+                while heap and heap[0][2] != heap[0][3].gen: heapq.heappop(heap)   # stale entries
+                if not heap:
+                    if all(t.done for t in self.tracks): break
+                    ctl.wait_woken(); continue
+                due, _, gen, tr = heap[0]
+                x, y, _, name = tr.cur
+                target = due
+                if name == "move":
+                    if not sched._sleep_until(target): continue
+                    heapq.heappop(heap)
+                    self.input.move(x, y)
+                    self._advance(tr, time.perf_counter_ns(), 0); continue
+                if sched.last_click_ns is not None: target = max(target, sched.last_click_ns + self.gap_ns)
+                if not sched._sleep_until(target): continue
+                heapq.heappop(heap)
+                sched.mark(target)
+                btn = self._buttons.get(name)
+                if btn is None: btn = self._buttons[name] = self.input.button(name)
+                off, jx, jy = hz.next()
+                click(x + jx, y + jy, btn, count); touch("counters")
+                tr.clicks += 1
+                self._advance(tr, time.perf_counter_ns(), off)
+        finally:
+            for tr in self.tracks: tr.close()
+            m.finish()
+            if exporter: exporter.stop()
+        return m
+
+# ---------- Engine process ----------
+# Optional isolation for the click engine: a spawned child process owns the engine and its timing
+# thread, so the UI, tray, hotkey and recorder threads never compete with it for a GIL. Commands
+# (run, stop, pause, timing, quit) go over a Pipe; the child publishes RunMetrics into a shared
+# block after every click under a seqlock (odd sequence = write in progress), so reading the
+# counters never blocks or signals the child. perf_counter_ns is system-wide, so start/end stamps
+# are meaningful in both processes.
+_ENGINE_SHM_FIELDS = ("state", "started_ns", "ended_ns", "clicks", "misses", "passes", "pause_ns",
+                      "late_sum_ns", "late_max_ns", "err_sum_ns", "err_max_ns")
+_ENGINE_SHM_SEQ = struct.Struct("<q")
+_ENGINE_SHM = struct.Struct("<" + "q" * (len(_ENGINE_SHM_FIELDS) + len(LATE_BUCKETS_NS) + 1))
+ENGINE_IDLE, ENGINE_RUNNING, ENGINE_PAUSED = 0, 1, 2
+ENGINE_POLL_S = 0.25   # how often the parent's run thread refreshes the UI counters
+ENGINE_READ_SPINS = 10000   # seqlock retries before read() falls back to its last good copy
+
+class _ShmMetricsWriter:
+    """The seqlock's only writer. A run publishes through publisher(rid), which is a no-op once
+       a newer run owns the block, so a stopped run that is still finishing can't interleave."""
+    def __init__(self, view: memoryview):
+        self.view, self.seq, self.metrics, self.state = view, 0, None, ENGINE_IDLE
+        self.rid = None
+        self.lock = threading.Lock()
+
+    def begin(self, rid: int, metrics: RunMetrics):
+        with self.lock:
+            self.rid, self.metrics, self.state = rid, metrics, ENGINE_RUNNING
+            self._write()
+
+    def publisher(self, rid: int, state: Optional[int] = None):
+        def publish(*_):
+            with self.lock:
+                if self.rid != rid: return
+                if state is not None: self.state = state
+                self._write()
+        return publish
+
+    def _write(self):
+        m, v = self.metrics, self.view
+        if m is None: return
+        self.seq += 1; _ENGINE_SHM_SEQ.pack_into(v, 0, self.seq)
+        _ENGINE_SHM.pack_into(v, _ENGINE_SHM_SEQ.size, self.state, m.started_ns, m.ended_ns, m.clicks, m.misses,
+                              m.passes, m.pause_ns, m.late_sum_ns, m.late_max_ns, m.err_sum_ns, m.err_max_ns, *m.buckets)
+        self.seq += 1; _ENGINE_SHM_SEQ.pack_into(v, 0, self.seq)
+
+def _engine_process_main(conn, shm, backend_name: str):
+    """Child side: one engine run at a time, driven by conn."""
+    pub = _ShmMetricsWriter(memoryview(shm).cast("B"))
+    backend = FakeBackend() if backend_name == "fake" else PynputBackend()
+    ctl = eng = th = traj = None
+    send_lock = threading.Lock()
+    def run(rid, eng, args):   # this run's engine is bound here: the loop below may start the next one
+        try: eng.run(*args)
+        finally:
+            pub.publisher(rid, ENGINE_IDLE)()
+            with send_lock: conn.send(("done", rid, eng.scheduler.summary()))
+    while True:
+        try: msg = conn.recv()
+        except (EOFError, OSError): msg = ("quit",)   # parent gone
+        cmd = msg[0]
+        if cmd == "run":
+            _, rid, fields, runs = msg
+            s = Settings(**fields); s.clamp()
+            ctl = RunControl()
+            runs = [(name, SequenceMeta(**meta), [Step(*r) for r in rows]) for name, meta, rows in runs]
+            publish = pub.publisher(rid)
+            if len(runs) > 1:
+                eng = MultiEngine(s, backend, ctl, publish)
+                for name, meta, steps in runs: eng.add(name, steps, meta)
+                args = ()
+            else:
+                eng = ClickEngine(s, backend, ctl, publish, trajectories=traj); traj = eng.trajectories
+                args = (runs[0][2], runs[0][1]) if runs else ()
+            pub.begin(rid, eng.metrics)
+            th = threading.Thread(target=run, args=(rid, eng, args), daemon=True); th.start()
+        elif ctl is None:
+            if cmd == "quit": return
+        elif cmd == "stop":
+            ctl.stop()
+        elif cmd == "pause":
+            ctl.set_paused(msg[1])
+            if pub.state != ENGINE_IDLE: pub.publisher(pub.rid, ENGINE_PAUSED if msg[1] else ENGINE_RUNNING)()
+        elif cmd == "timing":
+            eng.set_timing(*msg[1:])
+        elif cmd == "quit":
+            ctl.stop()
+            if th: th.join(2.0)
+            return
+
+class EngineProcess:
+    """Parent side. run() blocks (on a worker thread) until the child reports the run done;
+       everything else is a non-blocking command and safe from any thread."""
+    def __init__(self, backend: str = "pynput"):
+        import multiprocessing as mp
+        ctx = mp.get_context("spawn")   # never fork a process that has Tk and listener threads
+        self._shm = ctx.RawArray("b", _ENGINE_SHM_SEQ.size + _ENGINE_SHM.size)
+        self._view = memoryview(self._shm).cast("B")
+        self._conn, child = ctx.Pipe()
+        self._send_lock = threading.Lock()
+        self._recv_lock = threading.Lock()   # one reader at a time; replies are routed by run id
+        self._rid = 0
+        self._waiting: set = set()
+        self._done: dict = {}
+        self._last = (ENGINE_IDLE, RunMetrics())   # last consistent read()
+        self.proc = ctx.Process(target=_engine_process_main, args=(child, self._shm, backend),
+                                name=f"{APP_NAME}-engine", daemon=True)
+        self.proc.start(); child.close()
+        self.metrics = SharedRunMetrics(self)
+
+    def alive(self) -> bool: return self.proc.is_alive()
+
+    def send(self, *msg):
+        with self._send_lock:
+            try: self._conn.send(msg)
+            except (OSError, EOFError, ValueError): pass   # child gone: run() notices
+
+    def run(self, s: Settings, runs, on_tick=None) -> str:
+        """runs: [(name, SequenceMeta, steps)]; one entry -> ClickEngine, more -> MultiEngine.
+           Returns the child's scheduler summary. A previous run that is still finishing may be
+           waited on from another thread at the same time; each gets its own "done"."""
+        fields = {k: v for k, v in s.__dict__.items() if k not in ("current_seq", "current_meta")}
+        rows = [(name, asdict(meta or SequenceMeta()), list(step_rows(steps))) for name, meta, steps in runs]
+        with self._recv_lock:
+            self._rid += 1; rid = self._rid
+            self._waiting.add(rid)
+        self.send("run", rid, fields, rows)
+        seq = None
+        try:
+            while True:
+                with self._recv_lock:
+                    if rid in self._done: summary = self._done.pop(rid); break
+                    if self._conn.poll(ENGINE_POLL_S):
+                        try: _, done_rid, summ = self._conn.recv()
+                        except (EOFError, OSError): raise RuntimeError("click engine process exited") from None
+                        if done_rid in self._waiting: self._done[done_rid] = summ   # else nobody is waiting: drop
+                        continue
+                if not self.proc.is_alive(): raise RuntimeError("click engine process exited")
+                now = self.read_seq()
+                if on_tick and now != seq: seq = now; on_tick()
+        finally:
+            with self._recv_lock: self._waiting.discard(rid)
+        if on_tick: on_tick()
+        return summary
+
+    def set_timing(self, speed=None, idle_cap_ms=None): self.send("timing", speed, idle_cap_ms)
+
+    def read_seq(self) -> int: return _ENGINE_SHM_SEQ.unpack_from(self._view, 0)[0]
+
+    def read(self) -> Tuple[int, RunMetrics]:
+        """(state, metrics) as last published by the child; a consistent copy via the seqlock."""
+        v = self._view
+        for i in range(ENGINE_READ_SPINS):
+            a = self.read_seq()
+            if not a & 1:
+                vals = _ENGINE_SHM.unpack_from(v, _ENGINE_SHM_SEQ.size)
+                if self.read_seq() == a: break
+            elif i & 63 == 63 and not self.proc.is_alive():   # died mid-write: the block never settles
+                return ENGINE_IDLE, self._last[1]
+            time.sleep(0)
+        else:
+            return self._last
+        m = RunMetrics()
+        n = len(_ENGINE_SHM_FIELDS)
+        for k, val in zip(_ENGINE_SHM_FIELDS[1:], vals[1:n]): setattr(m, k, val)
+        m.buckets = list(vals[n:])
+        self._last = (vals[0], m)
+        return self._last
+
+    def close(self, timeout: float = 2.0):
+        self.send("quit")
+        self.proc.join(timeout)
+        if self.proc.is_alive(): self.proc.terminate()
+        self._conn.close()
+
+class SharedRunMetrics:
+    """RunMetrics-shaped view of an EngineProcess: every attribute/method reads a fresh copy."""
+    def __init__(self, proc: EngineProcess): self._proc = proc
+    def __getattr__(self, k): return getattr(self._proc.read()[1], k)
+
+class ProcessRunControl(RunControl):
+    """The App's RunControl for a process run: stop/pause also go to the child right away."""
+    def __init__(self, proc: EngineProcess):
+        super().__init__()
+        self.proc = proc
+
+    def stop(self):
+        super().stop(); self.proc.send("stop")
+
+    def set_paused(self, paused: bool):
+        super().set_paused(paused); self.proc.send("pause", bool(paused))
+
 # ---------- App ----------
 class App:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, backend: Optional[InputBackend] = None):
         self.root = root
+        self.status = StatusStore(lambda ms, fn: self.root.after(ms, fn))
+        self.hotkey_dispatch = HotkeyDispatcher(lambda ms, fn: self.root.after(ms, fn))
         self.s = Settings()
         self.running = False
-        self.paused = False
+        self.control = RunControl()
         self.dryrun_active = False
         self.listener = None
-        self.mouse = mouse.Controller()
-        self.stop_event = threading.Event()
+        self.input: InputBackend = backend or PynputBackend()
         self.click_thread: Optional[threading.Thread] = None
+        self.scheduler: Optional[ClickScheduler] = None
+        self.metrics: Optional[RunMetrics] = None
+        self.engine = None   # ClickEngine or MultiEngine of the current run
+        self.trajectories: Optional[TrajectoryCache] = None
+        self.engine_proc: Optional[EngineProcess] = None   # started on demand when engine_process is on
+        self.multi_run: List[Tuple[str, SequenceMeta, List[Step]]] = []   # set -> Start runs these together
         self.tray_icon = None
 
         # recording capture
-        self.rec_mouse_listener = None
-        self.rec_kb_listener = None
+        self.rec_listener = None
+        self.motion: Optional[MotionRecorder] = None   # set while a motion-mode recording runs
+        self._rec_last_ms: Optional[int] = None   # ms stamp of the last recorded step (click mode)
         self.rec_hold_active = False
         self.rec_in_progress = False
 
@@ -334,13 +2865,35 @@ class App:
         self.win_settings = None
         self.win_rec = None
         self.win_bubble = None
+        self._bubble_subscribed = False
         self.tree = None
+        self._tree_iids: List[str] = []    # recorder rows, aligned with current_seq; IIDs stay stable per step
+        self._tree_seq = None              # the list object the rows mirror (a new list -> rebuild)
+        self._tree_next_iid = 0
+        self._tree_sync_pending = False
         self.seq_search_var = None
+        self.seq_index = SequenceIndex()
+        self.seq_search: Optional[SequenceSearchWorker] = None
+        self.seq_watch: Optional[SequenceWatcher] = None
+        self.writer = WriteBehind(on_error=self._write_failed)   # settings/sequence files, off the Tk thread
 
+        # Critical path is settings -> global hotkeys; theme, tray, the last-sequence snapshot
+        # and windows follow on the Tk loop so the hotkeys answer before any of that is built.
+        self.root.withdraw()
+        ensure_app_dirs()
         self.load_settings()
+        self.publish_status()
+        self.start_hotkeys()
+        self.startup_ms = (time.perf_counter() - _T0) * 1000.0
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            self.tip(f"Startup: hotkeys ready after {self.startup_ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+        self.root.after(0, self._finish_startup)
+
+    def _finish_startup(self):
         self.setup_root()
         self.make_tray()
-        self.start_hotkeys()
+        self.load_last_snapshot()
+        if self.s.engine_process: self._engine_process()   # spawn now so the first Start is instant
 
         if not self.s.start_minimized:
             self.root.after(200, self.show_recorder_window)
@@ -350,42 +2903,35 @@ class App:
 
     # ----- config -----
     def load_settings(self):
-        cfg = configparser.ConfigParser()
-        if os.path.exists(INI_PATH):
-            cfg.read(INI_PATH, encoding="utf-8")
-        if "General" in cfg:
-            g = cfg["General"]
-            for k in self.s.__dict__.keys():
-                if k in ("current_seq","current_meta"): continue
-                if k in g:
-                    val = g.get(k)
-                    if isinstance(getattr(self.s, k), int):
-                        try: setattr(self.s, k, int(val))
-                        except: pass
-                    else:
-                        setattr(self.s, k, val)
-        self.s.clamp()
-        # last sequence snapshot (non-destructive)
-        lastp = os.path.join(SEQUENCES_DIR, "_last_sequence.json")
-        if os.path.exists(lastp):
+        self.s, self._ini_text = read_settings(INI_PATH)
+        self.save_settings()
+
+    def load_last_snapshot(self):
+        """Restore the last sequence snapshot (non-destructive)."""
+        snaps = [p for p in (os.path.join(SEQUENCES_DIR, "_last_sequence" + ext) for ext in SEQUENCE_EXTS) if os.path.exists(p)]
+        if snaps:
+            lastp = max(snaps, key=os.path.getmtime)   # the format setting may have changed since
             try:
-                with open(lastp,"r",encoding="utf-8") as f:
-                    data = json.load(f)
-                self.s.current_meta = SequenceMeta(**data.get("meta", {}))
-                self.s.current_seq = [Step(**st) for st in data.get("steps", [])]
+                self.s.current_meta, self.s.current_seq = load_sequence_file(lastp)
             except Exception:
-                pass
-        self.save_settings()
+                return
+            self.publish_status()
+            if self.win_rec: self.refresh_tree()
 
     def save_settings(self):
         cfg = configparser.ConfigParser()
         cfg["General"] = {k: str(v) for k,v in self.s.__dict__.items() if k not in ("current_seq","current_meta")}
-        with open(INI_PATH,"w",encoding="utf-8") as f:
-            cfg.write(f)
+        buf = io.StringIO(); cfg.write(buf); text = buf.getvalue()
+        if text == self._ini_text: return  # unchanged: skip the disk write
+        self.writer.submit(INI_PATH, lambda: text)
+        self._ini_text = text
+
+    def _write_failed(self, path: str, e: Exception):
+        """WriteBehind error hook (writer thread)."""
+        self.root.after(0, lambda: messagebox.showerror("Save failed", f"{os.path.basename(path)}: {e}"))
 
     # ----- theme -----
     def setup_root(self):
-        self.root.withdraw()
         self.root.title(f"{APP_NAME} {APP_VERSION}")
         try:
             if IS_WINDOWS and os.path.exists(ICON_PATH):
@@ -411,6 +2957,12 @@ class App:
 
     # ----- tray -----
     def make_tray(self):
+        # pystray/Pillow are imported and the icon built on the tray thread, off the Tk loop
+        self._tray_counters_ns = 0
+        self.status.subscribe(self._render_tray)
+        threading.Thread(target=self._run_tray, daemon=True).start()
+
+    def _run_tray(self):
         img = Image.open(ICON_PNG_PATH) if os.path.exists(ICON_PNG_PATH) else Image.new("RGBA",(64,64),(90,140,255,255))
         def startstop_text(_): return "Stop" if self.running else "Start"
         def pause_text(_): return "Resume" if self.paused else "Pause"
@@ -422,16 +2974,31 @@ class App:
             pystray.MenuItem("Settings…", lambda: self.root.after(0, self.show_settings_window)),
             pystray.MenuItem("Exit", lambda: self.root.after(0, self.exit_app))
         )
-        self.tray_icon = pystray.Icon("pyautoclicker", img, self.tray_title(), menu)
-        threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        self.tray_icon = pystray.Icon("pyautoclicker", img, self.tray_title(self.status.state), menu)
+        self.tray_icon.run()
 
-    def tray_title(self):
-        mode = "PAUSED" if self.paused else ("RUNNING" if self.running else ("Dry Run" if self.dryrun_active else "Idle"))
+    def tray_title(self, state: dict):
+        mode = "PAUSED" if state["paused"] else ("RUNNING" if state["running"] else ("Dry Run" if state["dryrun"] else "Idle"))
+        if state["running"] and self.metrics:
+            mode += f" — {self.metrics.clicks} clicks @ {self.metrics.cps():.1f} cps"
         return f"{APP_NAME} {APP_VERSION} — {mode}"
 
-    def update_tray(self):
-        if self.tray_icon:
-            self.tray_icon.title = self.tray_title()
+    def _render_tray(self, state: dict, changed: set):
+        if not self.tray_icon: return
+        if changed == {"counters"}:
+            # the title is an OS call: live counters refresh it at most once a second
+            now = time.perf_counter_ns()
+            if now - self._tray_counters_ns < 1_000_000_000: return
+            self._tray_counters_ns = now
+        title = self.tray_title(state)
+        if self.tray_icon.title != title:
+            self.tray_icon.title = title
+
+    def publish_status(self):
+        """Push running/paused/dry-run/profile into the status store (any thread)."""
+        self.status.set(running=self.running, paused=self.paused, dryrun=self.dryrun_active,
+                        profile=" + ".join(n for n, _, _ in self.multi_run) if self.multi_run
+                                else self.s.current_meta.name or "")
 
     # ----- hotkeys -----
     def start_hotkeys(self):
@@ -439,92 +3006,113 @@ class App:
             try: self.listener.stop()
             except Exception: pass
         if not self.s.hotkeys_enabled: return
+        bind = self.hotkey_dispatch.bind
         combos = {
-            self.s.hk_start_stop: lambda: self.root.after(0, self.toggle_start_stop),
-            self.s.hk_pause:      lambda: self.root.after(0, self.toggle_pause),
-            self.s.hk_add:        lambda: self.root.after(0, self.add_point_manual),
-            self.s.hk_finish:     lambda: self.root.after(0, self.finish_recording_manual),
-            self.s.hk_dryrun:     lambda: self.root.after(0, self._hotkey_dry_run),
-            "<ctrl>+<esc>":       lambda: self.root.after(0, self.exit_app),
+            self.s.hk_start_stop: bind("start/stop", self.toggle_start_stop, self._hk_stop_direct),
+            self.s.hk_pause:      bind("pause", self.toggle_pause, self._hk_pause_direct),
+            self.s.hk_add:        bind("add point", self.add_point_manual),
+            self.s.hk_finish:     bind("finish recording", self.finish_recording_manual),
+            self.s.hk_dryrun:     bind("dry run", self._hotkey_dry_run),
+            "<ctrl>+<esc>":       bind("exit", self.exit_app),
         }
-        self.listener = keyboard.GlobalHotKeys(combos); self.listener.start()
+        self.listener = self.input.hotkeys(combos)
+
+    # Listener-thread halves of the critical hotkeys: act on this run's RunControl at once and
+    # hand Tk a follow-up bound to that run (by the time Tk drains, the worker may be gone).
+    def _hk_stop_direct(self):
+        ctl = self.control
+        if not self.running or ctl.stopped: return None   # not running: Tk starts a run
+        ctl.stop()
+        return lambda: self._finish_stop(ctl)
+
+    def _finish_stop(self, ctl: RunControl):
+        if ctl is not self.control: return   # a newer run was started meanwhile
+        self.stop_worker()
+        self.running=False
+        self.publish_status(); self.beep(600,70)
+
+    def _hk_pause_direct(self):
+        ctl = self.control
+        if not self.running or ctl.stopped: return None
+        ctl.set_paused(not ctl.paused)
+        return lambda: (self.publish_status(), self.beep(750 if ctl.paused else 900, 70))
 
     def restart_hotkeys(self): self.start_hotkeys()
 
     # ----- click helpers -----
-    def human_delay(self, base_ms:int)->float:
-        r = self.s.random_ms
-        if r>0: base_ms += random.randint(-r,r)
-        base_ms = max(base_ms, int(1000/self.s.max_cps))
-        return max(0, base_ms)/1000.0
-
-    def apply_jitter(self,x:int,y:int)->Tuple[int,int]:
-        j=self.s.jitter_px
-        if j>0: x+=random.randint(-j,j); y+=random.randint(-j,j)
-        return x,y
-
-    def do_click(self, btn_name:str, x:int, y:int):
-        btn_map={"left":mouse.Button.left,"right":mouse.Button.right,"middle":mouse.Button.middle}
-        btn=btn_map.get(btn_name, mouse.Button.left)
-        x,y=self.apply_jitter(x,y)
-        self.mouse.position=(x,y)
-        self.mouse.click(btn, 2 if self.s.double_click else 1)
-
     # ----- worker -----
     def click_worker(self):
+        if isinstance(self.control, ProcessRunControl): return self._process_worker()
+        eng = None
         try:
-            meta = self.s.current_meta
-            inter = int(meta.inter_delay_ms) if meta and meta.inter_delay_ms>0 else None
-            repeats = int(meta.repeats) if meta and meta.repeats>0 else None
-            def wait_ms(ms): time.sleep(self.human_delay(ms))
-            if not self.s.current_seq:
-                while not self.stop_event.is_set():
-                    if self.paused: time.sleep(0.05); continue
-                    x,y=self.mouse.position
-                    self.do_click("left",x,y)
-                    wait_ms(self.s.base_interval_ms)
+            if self.multi_run:
+                eng = MultiEngine(self.s, self.input, self.control, self.status.touch)
+                for name, meta, steps in self.multi_run: eng.add(name, steps, meta)
             else:
-                passes_done=0
-                while not self.stop_event.is_set():
-                    for st in self.s.current_seq:
-                        if self.stop_event.is_set(): break
-                        while self.paused and not self.stop_event.is_set():
-                            time.sleep(0.05)
-                        delay = inter if inter is not None else st.delay_ms
-                        wait_ms(delay)
-                        self.do_click(st.button, st.x, st.y)
-                    passes_done+=1
-                    if repeats is not None and passes_done>=repeats:
-                        break
+                eng = ClickEngine(self.s, self.input, self.control, self.status.touch, trajectories=self.trajectories)
+                self.trajectories = eng.trajectories   # kept across runs: replays reuse cached glides
+            self.engine, self.metrics, self.scheduler = eng, eng.metrics, eng.scheduler
+            if self.multi_run: eng.run()
+            else: eng.run(self.s.current_seq, self.s.current_meta)
         finally:
             self.running=False
-            self.root.after(0, self.update_tray)
+            if eng: self.tip(f"Run finished: {eng.scheduler.summary()}.")
+            self.publish_status()
+
+    def _process_worker(self):
+        proc = self.control.proc
+        summary = None
+        try:
+            self.engine, self.metrics, self.scheduler = proc, proc.metrics, None
+            runs = self.multi_run or [(self.s.current_meta.name, self.s.current_meta, self.s.current_seq)]
+            summary = proc.run(self.s, runs, on_tick=lambda: self.status.touch("counters"))
+        except Exception as e:
+            self.tip(f"Engine process failed: {e}")
+        finally:
+            self.running=False
+            if summary: self.tip(f"Run finished: {summary}.")
+            self.publish_status()
+
+    def _engine_process(self) -> EngineProcess:
+        if self.engine_proc is None or not self.engine_proc.alive():
+            self.engine_proc = EngineProcess()
+        return self.engine_proc
+
+    def _new_control(self) -> RunControl:
+        return ProcessRunControl(self._engine_process()) if self.s.engine_process else RunControl()
 
     # ----- start/stop/pause -----
+    @property
+    def paused(self) -> bool: return self.control.paused
+
+    def stop_worker(self, timeout: float = 1.0) -> bool:
+        """Stop the current run and wait for the worker; it wakes at once, so this is bounded by
+           one in-flight do_click. Returns False if the thread is still alive after timeout."""
+        self.control.stop()
+        t = self.click_thread
+        if t and t.is_alive() and t is not threading.current_thread():
+            t.join(timeout=timeout)
+            if t.is_alive():
+                self.tip("Click worker did not stop in time; it will exit after its current click.")
+                return False
+        return True
+
     def toggle_start_stop(self):
         if self.running:
-            self.stop_event.set()
-            if self.click_thread and self.click_thread.is_alive():
-                self.click_thread.join(timeout=1.5)
-            self.running=False; self.paused=False
-            self.update_tray(); self.update_bubble_button_color(); self.beep(600,70)
+            self.stop_worker()
+            self.running=False
+            self.publish_status(); self.beep(600,70)
         else:
-            self.stop_event.clear(); self.paused=False; self.running=True
+            self.control = self._new_control(); self.running=True
             self.click_thread=threading.Thread(target=self.click_worker, daemon=True); self.click_thread.start()
-            self.update_tray(); self.update_bubble_button_color(); self.beep(1000,70)
+            self.publish_status(); self.beep(1000,70)
 
     def toggle_pause(self):
         if not self.running: return
-        self.paused = not self.paused
-        self.update_tray(); self.update_bubble_button_color(); self.beep(750 if self.paused else 900,70)
+        self.control.set_paused(not self.control.paused)
+        self.publish_status(); self.beep(750 if self.paused else 900,70)
 
     # ----- Dry Run helpers -----
-    def _estimate_preview_secs(self, n_steps:int, delay_ms:int, stay_ms:int, repeats:int=1) -> float:
-        delay_ms = max(0, int(delay_ms))
-        stay_ms  = max(0, int(stay_ms))
-        repeats  = max(1, int(repeats))
-        return repeats * (n_steps * (delay_ms/1000.0)) + (stay_ms/1000.0) + 0.25
-
     def _build_preview_style(self) -> _PreviewStyle:
         return _PreviewStyle(
             dot_size=max(6, int(getattr(self.s, "dryrun_dot_size", 18))),
@@ -535,18 +3123,15 @@ class App:
         )
 
     def _preview_sequence(self, seq_dict: dict, repeats:int=1):
-        # compute estimated duration and set dryrun_active flag for bubble/tray feedback
-        pts, inter = _dry__extract_points(seq_dict)
-        st = self._build_preview_style()
-        delay = st.step_delay_ms if st.step_delay_ms is not None else (inter if inter is not None else 150)
-        secs = self._estimate_preview_secs(len(pts), delay, st.stay_ms, repeats)
+        # set dryrun_active flag for bubble/tray feedback until the engine's last dot is gone
+        engine = dry_run_preview(seq_dict, self._build_preview_style(), repeats=repeats)
+        if engine is None: return
         self.dryrun_active = True
-        self.update_tray(); self.update_bubble_button_color()
-        dry_run_preview(seq_dict, st, repeats=repeats)
+        self.publish_status()
         def _end_flag():
             self.dryrun_active = False
-            self.update_tray(); self.update_bubble_button_color()
-        threading.Timer(secs, lambda: self.root.after(0, _end_flag)).start()
+            self.publish_status()
+        engine.on_done = _end_flag
 
     def _current_seq_for_preview(self) -> dict:
         try:
@@ -557,11 +3142,11 @@ class App:
             meta_delay = None
         seq = {
             "meta": {"inter_delay_ms": meta_delay if meta_delay is not None else 150},
-            "steps": [{"x": int(st.x), "y": int(st.y)} for st in (self.s.current_seq or [])]
+            "steps": [{"x": int(st.x), "y": int(st.y)} for st in (self.s.current_seq or []) if st.button != "move"]
         }
         if not seq["steps"]:
             try:
-                x, y = self.mouse.position
+                x, y = self.input.position()
                 seq["steps"] = [{"x": int(x), "y": int(y)}]
             except Exception:
                 pass
@@ -590,10 +3175,22 @@ class App:
         ttk.Button(top, text="Clear", command=self.clear_sequence).grid(row=0, column=2, padx=4, pady=4)
 
         ttk.Label(top, text="Tip: Hold CTRL and click to capture points. Release CTRL to stop.").grid(row=1, column=0, columnspan=3, sticky="w")
-
-        cols=("idx","x","y","btn")
+        v_motion = tk.IntVar(value=self.s.record_motion)
+        v_tol = tk.StringVar(value=str(self.s.motion_tolerance_px))
+        def motion_opts(*_):
+            try:
+                self.s.record_motion = int(v_motion.get()); self.s.motion_tolerance_px = int(v_tol.get() or 0)
+            except ValueError: return
+            self.s.clamp(); self.save_settings()
+        ttk.Checkbutton(top, text="Record mouse motion", variable=v_motion, command=motion_opts).grid(row=2, column=0, sticky="w", padx=4)
+        tolf = ttk.Frame(top); tolf.grid(row=2, column=1, columnspan=2, sticky="w")
+        ttk.Label(tolf, text="Simplify tolerance (px):").pack(side="left")
+        ent = ttk.Entry(tolf, textvariable=v_tol, width=5); ent.pack(side="left", padx=4)
+        ent.bind("<FocusOut>", motion_opts); ent.bind("<Return>", motion_opts)
+
+        cols=("idx","x","y","btn","delay")
         tree=ttk.Treeview(w, columns=cols, show="headings", height=10)
-        for c,h,wd in zip(cols,["#","X","Y","Button"],[40,100,100,100]):
+        for c,h,wd in zip(cols,["#","X","Y","Button","Delay(ms)"],[40,100,100,100,90]):
             tree.heading(c,text=h); tree.column(c,width=wd, anchor="center")
         tree.grid(row=1,column=0,sticky="nsew", padx=8, pady=6)
         self.tree=tree
@@ -602,6 +3199,7 @@ class App:
         ttk.Button(row2, text="Up", command=lambda:self._tree_move(-1)).pack(side="left", padx=4)
         ttk.Button(row2, text="Down", command=lambda:self._tree_move(1)).pack(side="left", padx=4)
         ttk.Button(row2, text="Delete", command=self._tree_delete).pack(side="left", padx=4)
+        ttk.Button(row2, text="Optimize…", command=self.optimize_dialog).pack(side="left", padx=4)
         ttk.Button(row2, text="Save Sequence…", command=self.save_sequence_dialog).pack(side="right", padx=4)
         ttk.Button(row2, text="Load Sequence…", command=self.load_sequence_dialog).pack(side="right", padx=4)
 
@@ -613,9 +3211,8 @@ class App:
         sel = self.tree.focus()
         if not sel: return None
         try:
-            vals = self.tree.item(sel, "values")
-            return int(vals[0]) - 1  # first column is 1-based index
-        except Exception:
+            return self._tree_iids.index(sel)
+        except ValueError:
             return None
 
     def _tree_move(self, delta: int):
@@ -623,31 +3220,75 @@ class App:
         if idx is None: return
         new_idx = idx + delta
         if new_idx < 0 or new_idx >= len(self.s.current_seq): return
-        self.s.current_seq[idx], self.s.current_seq[new_idx] = self.s.current_seq[new_idx], self.s.current_seq[idx]
-        self.refresh_tree()
-        # reselect moved row
-        for iid in self.tree.get_children():
-            vals = self.tree.item(iid, "values")
-            if int(vals[0]) == new_idx+1:
-                self.tree.selection_set(iid); self.tree.focus(iid); break
+        seq, iids = self.s.current_seq, self._tree_iids
+        seq[idx], seq[new_idx] = seq[new_idx], seq[idx]
+        iids[idx], iids[new_idx] = iids[new_idx], iids[idx]
+        self.tree.move(iids[new_idx], "", new_idx)
+        for i in (idx, new_idx):
+            self.tree.set(iids[i], "idx", i+1)
+        self.tree.selection_set(iids[new_idx]); self.tree.focus(iids[new_idx])
+        self._save_last_snapshot()   # queued; a burst of moves coalesces into one write
+
+    def optimize_dialog(self):
+        """Dedupe/reorder current_seq on a worker thread, then swap the result in and report."""
+        if self.rec_in_progress or not self.s.current_seq: return
+        d = tk.Toplevel(self.root); d.title("Optimize Sequence"); d.resizable(False, False)
+        d.grab_set()   # no recorder edits while the worker holds a view of current_seq
+        v_dd = tk.IntVar(value=1); v_tol = tk.StringVar(value="0"); v_re = tk.IntVar(value=0)
+        ttk.Checkbutton(d, text="Drop repeated steps within (px):", variable=v_dd).grid(row=0, column=0, sticky="w", padx=6, pady=4)
+        ttk.Entry(d, textvariable=v_tol, width=6).grid(row=0, column=1, sticky="w", padx=6)
+        ttk.Checkbutton(d, text="Reorder click runs for the shortest cursor path (order doesn't matter)", variable=v_re).grid(row=1, column=0, columnspan=2, sticky="w", padx=6, pady=4)
+        status = ttk.Label(d, text=""); status.grid(row=3, column=0, columnspan=2, sticky="w", padx=6)
+        def done(seq, out, r):
+            if d.winfo_exists(): d.destroy()
+            if self.s.current_seq is not seq:   # replaced (load/record) while we worked
+                self.tip("Sequence changed during optimization; result discarded."); return
+            self.s.current_seq = out
+            self.refresh_tree(); self._save_last_snapshot()
+            messagebox.showinfo("Optimize Sequence", optimize_report_text(r))
+        def failed(e):
+            if d.winfo_exists(): d.destroy()
+            messagebox.showerror("Optimize failed", str(e))
+        def go():
+            try: tol = None if not v_dd.get() else max(0, int(v_tol.get() or 0))
+            except ValueError:
+                messagebox.showerror("Invalid value", "Tolerance must be a whole number of pixels."); return
+            seq, meta, cps, reorder = self.s.current_seq, self.s.current_meta, self.s.max_cps, bool(v_re.get())
+            btn.config(state="disabled"); status.config(text=f"Optimizing {len(seq)} step(s)…")
+            def work():
+                try:
+                    out, r = optimize_sequence(list(seq), tol, reorder, meta=meta, max_cps=cps)
+                    self.root.after(0, done, seq, out, r)
+                except Exception as e:
+                    self.root.after(0, failed, e)
+            threading.Thread(target=work, daemon=True).start()
+        btn = ttk.Button(d, text="Optimize", command=go); btn.grid(row=2, column=0, columnspan=2, pady=8)
 
     def _tree_delete(self):
         idx = self._tree_selected_index()
         if idx is None: return
         del self.s.current_seq[idx]
-        self.refresh_tree()
+        self.tree.delete(self._tree_iids.pop(idx))
+        for i in range(idx, len(self._tree_iids)):
+            self.tree.set(self._tree_iids[i], "idx", i+1)
+        self._save_last_snapshot()
 
     def start_recording(self):
         if self.rec_in_progress: return
         self.s.current_seq = []
         self.s.current_meta = SequenceMeta()
+        self.multi_run = []
+        self.publish_status()
+        self.refresh_tree()
         self.rec_in_progress = True
         self.rec_hold_active = False
         self.beep(1200,70)
-        self.rec_mouse_listener = mouse.Listener(on_click=self._rec_on_click)
-        self.rec_kb_listener = keyboard.Listener(on_press=self._rec_on_press, on_release=self._rec_on_release)
-        self.rec_mouse_listener.start(); self.rec_kb_listener.start()
-        self.tip("Recording: hold CTRL and click to capture points.")
+        self.motion = MotionRecorder(self.s.motion_buffer_events) if self.s.record_motion else None
+        self._rec_last_ms = None
+        self.rec_listener = self.input.listen(on_click=self._rec_on_click,
+                                              on_press=self._rec_on_press, on_release=self._rec_on_release,
+                                              on_move=self._rec_on_move if self.motion else None)
+        self.tip("Recording: hold CTRL and click to capture points" + (" (mouse motion too)." if self.motion else "."))
 
     def finish_recording_manual(self):
         self._stop_rec_listeners()
@@ -656,8 +3297,13 @@ class App:
         self.rec_in_progress=False
         self.rec_hold_active=False
         self.beep(1000,70)
+        if self.motion:
+            mr, self.motion = self.motion, None
+            self.s.current_seq = mr.to_steps(self.s.motion_tolerance_px)
+            self.tip(f"Motion: {mr.n} event(s) captured -> {len(self.s.current_seq)} step(s)"
+                     + (f"; {mr.dropped} oldest dropped (buffer full)." if mr.dropped else "."))
         self.tip(f"Recording finished. {len(self.s.current_seq)} step(s).")
-        self.refresh_tree()
+        self._tree_sync()
         if self.s.current_seq:
             self._save_last_snapshot()
             if self.s.auto_save_after_record:
@@ -665,74 +3311,122 @@ class App:
 
     def _stop_rec_listeners(self):
         try:
-            if self.rec_mouse_listener: self.rec_mouse_listener.stop()
+            if self.rec_listener: self.rec_listener.stop()
         except Exception: pass
-        try:
-            if self.rec_kb_listener: self.rec_kb_listener.stop()
-        except Exception: pass
-        self.rec_mouse_listener=None; self.rec_kb_listener=None
+        self.rec_listener=None
 
     def _rec_on_press(self, key):
-        if key in (Key.ctrl, Key.ctrl_l, Key.ctrl_r): self.rec_hold_active=True
+        if key == "ctrl": self.rec_hold_active=True
 
     def _rec_on_release(self, key):
-        if key in (Key.ctrl, Key.ctrl_l, Key.ctrl_r):
+        if key == "ctrl":
             self.rec_hold_active=False
             self.root.after(0, self.finish_recording_manual)
 
+    def _rec_on_move(self, x, y):
+        if self.rec_hold_active: self.motion.add(x, y)
+
     def _rec_on_click(self, x, y, button, pressed):
         if not pressed: return
+        if self.motion is not None:
+            if self.rec_hold_active: self.motion.add(x, y, MOTION_CODES.get(button, 0))
+            return
         if self.rec_in_progress and self.rec_hold_active:
-            btn_name = "left" if button == mouse.Button.left else "right" if button == mouse.Button.right else "middle"
-            self.s.current_seq.append(Step(x=int(x), y=int(y), delay_ms=0, button=btn_name))
-            self.root.after(0, self.refresh_tree)
+            self.s.current_seq.append(Step(x=x, y=y, delay_ms=self._rec_delay_ms(), button=button))
+            self.schedule_tree_sync()
+
+    def _rec_delay_ms(self) -> int:
+        """Gap since the previous recorded step (0 for the first), from monotonic ms stamps so
+           rounding never accumulates over a long session."""
+        ms = time.perf_counter_ns() // 1_000_000
+        last, self._rec_last_ms = self._rec_last_ms, ms
+        return 0 if last is None else ms - last
 
     def add_point_manual(self):
-        x, y = self.mouse.position
-        self.s.current_seq.append(Step(x=int(x), y=int(y), delay_ms=0, button="left"))
-        self.refresh_tree()
+        x, y = self.input.position()
+        if self.rec_in_progress and self.motion is not None:   # kept in time order with the motion
+            self.motion.add_manual(int(x), int(y), MOTION_CODES["left"]); return
+        delay = self._rec_delay_ms() if self.rec_in_progress else 0
+        self.s.current_seq.append(Step(x=int(x), y=int(y), delay_ms=delay, button="left"))
+        self.schedule_tree_sync()
 
     def clear_sequence(self):
         self.s.current_seq.clear()
-        self.refresh_tree()
+        if self.tree: self.tree.delete(*self._tree_iids)
+        self._tree_iids = []
 
     def _save_last_snapshot(self):
-        path = os.path.join(SEQUENCES_DIR, "_last_sequence.json")
-        payload = {"meta": asdict(self.s.current_meta), "steps":[asdict(s) for s in self.s.current_seq]}
-        try:
-            with open(path,"w",encoding="utf-8") as f: json.dump(payload,f,indent=2)
-        except Exception: pass
+        self._save_sequence_async(os.path.join(SEQUENCES_DIR, "_last_sequence" + self._sequence_ext()),
+                                  self.s.current_meta, self.s.current_seq, quiet=True)
+
+    def _save_sequence_async(self, path: str, meta: SequenceMeta, steps: List[Step], quiet: bool = False):
+        """Queue a sequence file write; steps are copied now so later edits don't leak into it."""
+        steps = list(steps)
+        def render():
+            try: return sequence_bytes(path, meta, steps)
+            except ValueError:
+                if quiet: return None   # e.g. a snapshot .pacseq can't hold this button: skip it
+                raise
+        self.writer.submit(path, render)
 
     def refresh_tree(self):
+        """Full rebuild; use when current_seq was replaced (load, new recording)."""
         if not self.tree: return
         self.tree.delete(*self.tree.get_children())
-        for i, st in enumerate(self.s.current_seq, start=1):
-            self.tree.insert("", "end", values=(i, st.x, st.y, st.button))
+        self._tree_iids = []
+        self._tree_seq = self.s.current_seq
+        self._tree_append_rows()
+
+    def _tree_append_rows(self):
+        seq, iids, tree = self._tree_seq, self._tree_iids, self.tree
+        for i in range(len(iids), len(seq)):
+            st = seq[i]
+            iid = f"s{self._tree_next_iid}"; self._tree_next_iid += 1
+            tree.insert("", "end", iid=iid, values=(i+1, st.x, st.y, st.button, st.delay_ms))
+            iids.append(iid)
+
+    def schedule_tree_sync(self):
+        """Safe from any thread: coalesce bursts of appended steps into one update per frame."""
+        if self._tree_sync_pending: return
+        self._tree_sync_pending = True
+        self.root.after(16, self._tree_sync)
+
+    def _tree_sync(self):
+        self._tree_sync_pending = False
+        if not self.tree: return
+        if self.s.current_seq is not self._tree_seq or len(self._tree_iids) > len(self.s.current_seq):
+            self.refresh_tree()
+        else:
+            self._tree_append_rows()
 
     # Save/Load with metadata, inter-delay, repeats
+    def _sequence_ext(self) -> str:
+        return PACSEQ_EXT if self.s.sequence_format == "pacseq" else ".json"
+
     def save_sequence_dialog(self):
         meta = self._sequence_meta_dialog()
         if not meta: return
         self.s.current_meta = meta
-        payload = {"meta": asdict(meta), "steps":[asdict(s) for s in self.s.current_seq]}
-        path = unique_path(SEQUENCES_DIR, meta.name or time.strftime("sequence_%Y%m%d_%H%M%S"))
-        with open(path,"w",encoding="utf-8") as f: json.dump(payload,f,indent=2)
-        self.tip(f"Saved sequence '{os.path.basename(path)}'.")
+        self.publish_status()
+        path = unique_path(SEQUENCES_DIR, meta.name or time.strftime("sequence_%Y%m%d_%H%M%S"),
+                           self._sequence_ext(), self.writer.pending_paths())
+        self._save_sequence_async(path, meta, self.s.current_seq)   # errors surface via _write_failed
+        self.tip(f"Saving sequence '{os.path.basename(path)}'.")
         self._save_last_snapshot()
 
     def load_sequence_dialog(self):
-        p = filedialog.askopenfilename(initialdir=SEQUENCES_DIR, filetypes=[("Sequences","*.json")])
+        p = filedialog.askopenfilename(initialdir=SEQUENCES_DIR, filetypes=[("Sequences","*.json *.pacseq"),("JSON","*.json"),("Binary","*.pacseq")])
         if not p: return
-        with open(p,"r",encoding="utf-8") as f: data=json.load(f)
-        self.s.current_meta = SequenceMeta(**data.get("meta",{}))
-        self.s.current_seq = [Step(**st) for st in data.get("steps",[])]
+        self.s.current_meta, self.s.current_seq = load_sequence_file(p)
+        self.multi_run = []
+        self.publish_status()
         self.refresh_tree()
 
     def _sequence_meta_dialog(self)->Optional[SequenceMeta]:
         d = tk.Toplevel(self.root); d.title("Save Sequence — Details"); d.resizable(False, False)
-        labels = [("Name","name"),("Site","site"),("Slot","slot"),("Date","date"),("Notes","notes"),("Inter-click delay (ms)","inter_delay_ms"),("Repeats (1–100000, 0=∞)","repeats")]
+        labels = [("Name","name"),("Site","site"),("Slot","slot"),("Date","date"),("Notes","notes"),("Inter-click delay (ms, 0 = as recorded)","inter_delay_ms"),("Repeats (1–100000, 0=∞)","repeats")]
         vars = {key: tk.StringVar() for _,key in labels}
-        vars["inter_delay_ms"].set("100")
+        vars["inter_delay_ms"].set("0")
         vars["repeats"].set("0")
         for i,(lbl,key) in enumerate(labels):
             ttk.Label(d, text=lbl+":").grid(row=i, column=0, sticky="e", padx=6, pady=4)
@@ -782,8 +3476,21 @@ class App:
         v_dc=tk.IntVar(value=self.s.double_click); ttk.Checkbutton(tab1, text="Double-click each step", variable=v_dc).grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
         v_dark=tk.IntVar(value=self.s.dark_mode); ttk.Checkbutton(tab1, text="Dark mode", variable=v_dark).grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
         v_auto=tk.IntVar(value=self.s.auto_save_after_record); ttk.Checkbutton(tab1, text="Auto-open 'Save Sequence' after recording", variable=v_auto).grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
+        v_proc=tk.IntVar(value=self.s.engine_process); ttk.Checkbutton(tab1, text="Run clicks in a separate process (steadier timing; applies from the next Start)", variable=v_proc).grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
+        ttk.Label(tab1, text="Randomness distribution:").grid(row=row,column=0,sticky="w"); v_dist=tk.StringVar(value=self.s.humanize_dist); ttk.Combobox(tab1, textvariable=v_dist, values=HUMANIZE_DISTS, state="readonly", width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Random seed (-1 = random):").grid(row=row,column=0,sticky="w"); v_seed=tk.StringVar(value=str(self.s.humanize_seed)); ttk.Entry(tab1, textvariable=v_seed, width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Export run metrics:").grid(row=row,column=0,sticky="w"); v_mexp=tk.StringVar(value=self.s.metrics_export); ttk.Combobox(tab1, textvariable=v_mexp, values=METRICS_EXPORTS, state="readonly", width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Export every (s):").grid(row=row,column=0,sticky="w"); v_msec=tk.StringVar(value=str(self.s.metrics_export_secs)); ttk.Entry(tab1, textvariable=v_msec, width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Save sequences as:").grid(row=row,column=0,sticky="w"); v_sfmt=tk.StringVar(value=self.s.sequence_format); ttk.Combobox(tab1, textvariable=v_sfmt, values=SEQUENCE_FORMATS, state="readonly", width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Replay speed (%):").grid(row=row,column=0,sticky="w"); v_spd=tk.StringVar(value=str(self.s.replay_speed_pct)); ttk.Entry(tab1, textvariable=v_spd, width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Cap idle gaps at (ms, 0 = off):").grid(row=row,column=0,sticky="w"); v_cap=tk.StringVar(value=str(self.s.idle_gap_cap_ms)); ttk.Entry(tab1, textvariable=v_cap, width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Cursor glide between steps:").grid(row=row,column=0,sticky="w"); v_mst=tk.StringVar(value=self.s.move_style); ttk.Combobox(tab1, textvariable=v_mst, values=MOVE_STYLES, state="readonly", width=10).grid(row=row,column=1,sticky="w"); row+=1
+        ttk.Label(tab1, text="Glide duration (ms) / rate (Hz):").grid(row=row,column=0,sticky="w")
+        gf=ttk.Frame(tab1); gf.grid(row=row,column=1,sticky="w"); row+=1
+        v_mms=tk.StringVar(value=str(self.s.move_ms)); ttk.Entry(gf, textvariable=v_mms, width=6).pack(side="left")
+        v_mhz=tk.StringVar(value=str(self.s.move_rate_hz)); ttk.Entry(gf, textvariable=v_mhz, width=6).pack(side="left", padx=(4,0))
         ttk.Button(tab1, text="Open Recorder…", command=self.show_recorder_window).grid(row=row,column=0, pady=(6,8)); row+=1
-        ttk.Button(tab1, text="Save", command=lambda:self._save_general(v_bi,v_rm,v_jp,v_cps,v_dc,v_dark,v_auto)).grid(row=row,column=0,pady=8)
+        ttk.Button(tab1, text="Save", command=lambda:self._save_general(v_bi,v_rm,v_jp,v_cps,v_dc,v_dark,v_auto,v_dist,v_seed,v_mexp,v_msec,v_sfmt,v_spd,v_cap,v_mst,v_mms,v_mhz,v_proc)).grid(row=row,column=0,pady=8)
 
         # Hotkeys tab
         tab2 = ttk.Frame(nb, padding=10); nb.add(tab2, text="Hotkeys")
@@ -800,7 +3507,10 @@ class App:
         hk_finish=hkrow("Finish recording (manual):", self.s.hk_finish)
         row += 1
         hk_dry=hkrow("Dry Run (preview):", self.s.hk_dryrun)
-        ttk.Button(tab2, text="Save", command=lambda:self._save_hotkeys(hk_start,hk_pause,hk_add,hk_finish,hk_dry)).grid(row=row,column=0,pady=8)
+        ttk.Button(tab2, text="Save", command=lambda:self._save_hotkeys(hk_start,hk_pause,hk_add,hk_finish,hk_dry)).grid(row=row,column=0,pady=8); row+=1
+        ttk.Label(tab2, text="Press -> action latency (recent presses):").grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
+        lat = ttk.Label(tab2, text=self.hotkey_dispatch.summary(), justify="left"); lat.grid(row=row,column=0,columnspan=2,sticky="w"); row+=1
+        ttk.Button(tab2, text="Refresh", command=lambda: lat.config(text=self.hotkey_dispatch.summary())).grid(row=row,column=0,sticky="w")
 
         # Preview tab (for dot style)
         tabP = ttk.Frame(nb, padding=10); nb.add(tabP, text="Preview")
@@ -837,18 +3547,32 @@ class App:
             "Hotkeys:\n"
             " • Single keys like X, P, 1 (bare keys) or named keys: Space, Enter, Esc, Tab, arrows, Home/End, PageUp/Down, Insert, Delete, Backspace.\n"
             " • Combos like Ctrl+Alt+S, and F-keys like F6/F7/F8/F9.\n"
+            " • Stop and Pause act on the click run straight from the hotkey thread, even while the window is busy;\n"
+            "   the Hotkeys tab shows press-to-action latency (entries marked (ui) include the window update).\n"
             " • Dry Run: press F7 (default) or use Tray/Sequences to preview coloured dots where clicks would happen (no real clicks).\n\n"
             "Recorder:\n"
             " • Click 'Start Recording', then hold CTRL and click to add points. Release CTRL to stop.\n"
-            " • When saving, set Inter-click delay (ms) and Repeat count (0 = infinite).\n"
-            " • Save never overwrites; it creates a new file automatically.\n\n"
+            " • Each step keeps the real gap since the previous one; the Delay(ms) column shows it.\n"
+            " • When saving, set Inter-click delay (ms; 0 keeps the recorded timing) and Repeat count (0 = infinite).\n"
+            " • Save never overwrites; it creates a new file automatically.\n"
+            " • Optimize… drops repeated points and can reorder runs of same-button clicks for the shortest cursor path.\n"
+            " • 'Record mouse motion' also captures the cursor path between clicks (simplified on finish; 0 px keeps every sample).\n\n"
             "Playback & Bubble:\n"
             " • Start/Stop, Pause/Resume via hotkeys or tray/bubble.\n"
             " • Bubble Start/Stop button colours: Green=Idle, Red=Running, Yellow=Dry Run.\n"
-            " • If a sequence is loaded and you set Inter-delay/Repeats in its metadata, those override per-step delays.\n\n"
+            " • If a sequence is loaded and you set Inter-delay/Repeats in its metadata, those override per-step delays.\n"
+            " • Replay speed (General tab) scales recorded step delays (not Base interval), e.g. 50% = half, 400% = 4x; 'Cap idle gaps' shortens\n"
+            "   long pauses first so a session replays fast but keeps its rhythm. Saving applies both to a running replay.\n"
+            " • Cursor glide moves the pointer along a straight (linear/minjerk) or curved (bezier) path during the last\n"
+            "   'Glide duration' ms before each click instead of jumping there; the click timing is unchanged.\n\n"
             "Sequences:\n"
-            " • Search across Name/Site/Slot/Date/Notes/File.\n"
+            " • Search across Name/Site/Slot/Date/Notes/File by word prefix; best matches (Name first) are listed on top.\n"
             " • Click the 'Dry Run' cell in the last column to preview that sequence.\n"
+            " • The list follows the folder live: files added, changed or removed (also by other tools or sync) update their\n"
+            "   rows within about a second. Refresh forces a full rescan.\n"
+            " • Sequences are saved as JSON or, for very long recordings, the binary .pacseq format (General tab); both load everywhere.\n"
+            " • Library: Validate all lists unreadable files (the list hides them); Export/Import move the whole folder as one .zip\n"
+            "   (imported names that are taken get ' (2)', ...); Convert all writes a copy in the 'Save sequences as' format.\n"
         )
         txt = tk.Text(tab5, width=70, height=20, wrap="word")
         txt.insert("1.0", help_txt)
@@ -864,7 +3588,7 @@ class App:
         self.seq_search_var = tk.StringVar()
         ent = ttk.Entry(top, textvariable=self.seq_search_var, width=32)
         ent.pack(side="left", padx=(6,6))
-        ttk.Button(top, text="Clear", command=lambda: (self.seq_search_var.set(""), refresh())).pack(side="left")
+        ttk.Button(top, text="Clear", command=lambda: self.seq_search_var.set("")).pack(side="left")
 
         cols = ("name","site","slot","date","notes","delay","repeats","steps","file","preview")
         tree = ttk.Treeview(parent, columns=cols, show="headings", height=12)
@@ -874,31 +3598,50 @@ class App:
             tree.heading(c, text=h); tree.column(c, width=wd, anchor="center")
         tree.pack(fill="both", expand=True, pady=(0,8))
 
-        # Data reload with filter
+        # Index sync and search run on a worker thread; typing is debounced and results are
+        # streamed into the tree in chunks, abandoning the stream as soon as a newer query lands.
+        # The folder watcher feeds per-file changes to the worker, which patches just those rows.
+        SEARCH_DEBOUNCE_MS, STREAM_CHUNK = 150, 250
+        pending = {"after": None, "streaming": False}
+        def stream(gen, names, rows, start=0):
+            if gen != self.seq_search.gen or not tree.winfo_exists(): return
+            if start == 0: tree.delete(*tree.get_children())
+            for fn in names[start:start+STREAM_CHUNK]:
+                vals = rows.get(fn)
+                if vals is not None: tree.insert("", "end", iid=fn, values=vals)
+            pending["streaming"] = start + STREAM_CHUNK < len(names)
+            if pending["streaming"]:
+                tree.after(1, stream, gen, names, rows, start + STREAM_CHUNK)
+        def patch(gen, changes):
+            if gen != self.seq_search.gen or not tree.winfo_exists(): return
+            if pending["streaming"]:   # rows still arriving: re-query (no rescan) instead of patching
+                search_now(); return
+            for fn, _vals, rank in changes:   # take changed rows out first so ranks index the untouched ones
+                if not tree.exists(fn): continue
+                if rank is None: tree.delete(fn)
+                else: tree.detach(fn)
+            for fn, vals, rank in sorted((c for c in changes if c[2] is not None), key=lambda c: c[2]):
+                if tree.exists(fn): tree.item(fn, values=vals); tree.move(fn, "", rank)
+                else: tree.insert("", rank, iid=fn, values=vals)
+        def on_results(gen, names, rows):
+            self.root.after(0, stream, gen, names, rows)
+        def on_changes(gen, changes):
+            self.root.after(0, patch, gen, changes)
+        if self.seq_search: self.seq_search.stop()
+        self.seq_search = SequenceSearchWorker(self.seq_index, on_results, on_changes)
+        if self.seq_watch: self.seq_watch.stop()
+        worker = self.seq_search
+        self.seq_watch = SequenceWatcher(SEQUENCES_DIR, lambda ev: worker.notify([fn for _kind, fn in ev]))
+        def search_now():
+            pending["after"] = None
+            self.seq_search.submit(self.seq_search_var.get())
+        def on_type(*_):
+            if pending["after"]: tree.after_cancel(pending["after"])
+            pending["after"] = tree.after(SEARCH_DEBOUNCE_MS, search_now)
         def refresh():
-            filt = (self.seq_search_var.get() or "").strip().lower()
-            tree.delete(*tree.get_children())
-            for fn in sorted(os.listdir(SEQUENCES_DIR)):
-                if not fn.lower().endswith(".json"): continue
-                try:
-                    path = os.path.join(SEQUENCES_DIR, fn)
-                    with open(path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    meta = data.get("meta", {})
-                    steps = data.get("steps", [])
-                    row = (
-                        meta.get("name",""), meta.get("site",""), meta.get("slot",""),
-                        meta.get("date",""), meta.get("notes",""),
-                        meta.get("inter_delay_ms",0), meta.get("repeats",0), len(steps), fn, "Dry Run"
-                    )
-                    hay = " ".join(map(str, row[:-1])).lower()
-                    if filt and filt not in hay:
-                        continue
-                    tree.insert("", "end", iid=fn, values=row)
-                except Exception:
-                    pass
+            self.seq_search.submit(self.seq_search_var.get(), refresh=True)
 
-        self.seq_search_var.trace_add("write", lambda *_: refresh())
+        self.seq_search_var.trace_add("write", on_type)
         refresh()
 
         # Buttons
@@ -907,10 +3650,9 @@ class App:
             sel = tree.focus()
             if not sel: return
             path = os.path.join(SEQUENCES_DIR, sel)
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.s.current_meta = SequenceMeta(**data.get("meta", {}))
-            self.s.current_seq = [Step(**s) for s in data.get("steps", [])]
+            self.s.current_meta, self.s.current_seq = load_sequence_file(path)
+            self.multi_run = []
+            self.publish_status()
             self.refresh_tree()
             self.tip(f"Loaded '{sel}'.")
         def del_sel():
@@ -918,9 +3660,24 @@ class App:
             if not sel: return
             path = os.path.join(SEQUENCES_DIR, sel)
             try:
-                os.remove(path); refresh(); self.tip(f"Deleted '{sel}'.")
+                os.remove(path); self.seq_search.notify([sel]); self.tip(f"Deleted '{sel}'.")
             except Exception as e:
                 messagebox.showerror("Delete failed", str(e))
+        def run_together():
+            sel = tree.selection()
+            if len(sel) < 2:
+                messagebox.showinfo("Run together", "Select two or more sequences (Ctrl+click)."); return
+            try:
+                runs = []
+                for fn in sel:
+                    meta, steps = load_sequence_file(os.path.join(SEQUENCES_DIR, fn))
+                    runs.append((meta.name or fn, meta, steps))
+            except Exception as e:
+                messagebox.showerror("Run together failed", str(e)); return
+            if self.running: self.toggle_start_stop()
+            self.multi_run = runs
+            self.toggle_start_stop()
+            self.tip(f"Running {len(runs)} sequences together; Load selected returns to a single sequence.")
         def open_folder():
             folder = os.path.realpath(SEQUENCES_DIR)
             if IS_WINDOWS:
@@ -933,9 +3690,7 @@ class App:
             if not sel: return
             path = os.path.join(SEQUENCES_DIR, sel)
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._preview_sequence(data, repeats=1)
+                self._preview_sequence(sequence_preview_data(path), repeats=1)
             except Exception as e:
                 messagebox.showerror("Dry Run failed", str(e))
 
@@ -943,8 +3698,41 @@ class App:
         ttk.Button(btns, text="Delete selected", command=del_sel).pack(side="left", padx=4, pady=4)
         ttk.Button(btns, text="Refresh", command=refresh).pack(side="left", padx=4, pady=4)
         ttk.Button(btns, text="Dry Run selected", command=dryrun_sel).pack(side="left", padx=4, pady=4)
+        ttk.Button(btns, text="Run selected together", command=run_together).pack(side="left", padx=4, pady=4)
         ttk.Button(btns, text="Open folder", command=open_folder).pack(side="right", padx=4, pady=4)
 
+        # Whole-library operations run off the Tk thread (process pool for big folders)
+        lib = ttk.Frame(parent); lib.pack(fill="x")
+        ttk.Label(lib, text="Library:").pack(side="left", padx=(4,0))
+        def lib_op(title, fn):
+            def work():
+                try: r = fn()
+                except Exception as e:
+                    self.root.after(0, messagebox.showerror, title, str(e)); return
+                def show():
+                    refresh()
+                    (messagebox.showwarning if r["failed"] else messagebox.showinfo)(title, library_report_text(r))
+                self.root.after(0, show)
+            self.tip(f"{title}…")
+            threading.Thread(target=work, daemon=True).start()
+        def validate_all():
+            lib_op("Validate library", lambda: validate_library(library_files(SEQUENCES_DIR)))
+        def export_lib():
+            p = filedialog.asksaveasfilename(defaultextension=LIBRARY_ARCHIVE_EXT, filetypes=[("Sequence library","*.zip")],
+                                             initialfile=time.strftime("sequences_%Y%m%d") + LIBRARY_ARCHIVE_EXT)
+            if p: lib_op("Export library", lambda: pack_library(SEQUENCES_DIR, p))
+        def import_lib():
+            p = filedialog.askopenfilename(filetypes=[("Sequence library","*.zip")])
+            if p: lib_op("Import library", lambda: unpack_library(p, SEQUENCES_DIR))
+        def convert_all():
+            fmt = self.s.sequence_format
+            if messagebox.askyesno("Convert library", f"Write a {fmt} copy of every sequence that isn't {fmt} yet? Originals are kept."):
+                lib_op("Convert library", lambda: convert_library(SEQUENCES_DIR, fmt))
+        ttk.Button(lib, text="Validate all", command=validate_all).pack(side="left", padx=4, pady=4)
+        ttk.Button(lib, text="Export…", command=export_lib).pack(side="left", padx=4, pady=4)
+        ttk.Button(lib, text="Import…", command=import_lib).pack(side="left", padx=4, pady=4)
+        ttk.Button(lib, text="Convert all to saved format", command=convert_all).pack(side="left", padx=4, pady=4)
+
         # Click in last column ("Dry Run") to preview that row
         def on_tree_click(event):
             region = tree.identify("region", event.x, event.y)
@@ -956,16 +3744,14 @@ class App:
             if not item: return
             path = os.path.join(SEQUENCES_DIR, item)
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._preview_sequence(data, repeats=1)
+                self._preview_sequence(sequence_preview_data(path), repeats=1)
             except Exception as e:
                 messagebox.showerror("Dry Run failed", str(e))
 
         tree.bind("<Button-1>", on_tree_click)
 
     # ----- Settings save helpers -----
-    def _save_general(self, v_bi,v_rm,v_jp,v_cps,v_dc,v_dark,v_auto):
+    def _save_general(self, v_bi,v_rm,v_jp,v_cps,v_dc,v_dark,v_auto,v_dist,v_seed,v_mexp,v_msec,v_sfmt,v_spd,v_cap,v_mst,v_mms,v_mhz,v_proc):
         self.s.base_interval_ms=int(v_bi.get() or 100)
         self.s.random_ms=int(v_rm.get() or 0)
         self.s.jitter_px=int(v_jp.get() or 0)
@@ -973,7 +3759,21 @@ class App:
         self.s.double_click=int(v_dc.get() or 0)
         self.s.dark_mode=int(v_dark.get() or 0)
         self.s.auto_save_after_record=int(v_auto.get() or 1)
-        self.s.clamp(); self.save_settings(); self.apply_theme(); self.tip("General saved.")
+        self.s.humanize_dist=v_dist.get() or "uniform"
+        self.s.humanize_seed=int(v_seed.get() or -1)
+        self.s.metrics_export=v_mexp.get() or "off"
+        self.s.metrics_export_secs=int(v_msec.get() or 5)
+        self.s.sequence_format=v_sfmt.get() or "json"
+        self.s.replay_speed_pct=int(v_spd.get() or 100)
+        self.s.idle_gap_cap_ms=int(v_cap.get() or 0)
+        self.s.move_style=v_mst.get() or "off"
+        self.s.move_ms=int(v_mms.get() or 120)
+        self.s.move_rate_hz=int(v_mhz.get() or 125)
+        self.s.engine_process=int(v_proc.get() or 0)
+        self.s.clamp(); self.save_settings(); self.apply_theme()
+        if self.running and self.engine:   # the active run picks the new timing up from its next step
+            self.engine.set_timing(self.s.replay_speed_pct / 100, self.s.idle_gap_cap_ms)
+        self.tip("General saved.")
 
     def _save_hotkeys(self, hk_start,hk_pause,hk_add,hk_finish,hk_dry):
         self.s.hk_start_stop=normalize_hotkey(hk_start.get())
@@ -1002,7 +3802,8 @@ class App:
         # Use tk.Button so we can color it
         self.btn_startstop = tk.Button(frm, text="Start/Stop", command=self.toggle_start_stop)
         self.btn_startstop.grid(row=1, column=1)
-        self.update_bubble_button_color()
+        self.lbl_metrics = ttk.Label(frm, text="", font=("Segoe UI", 8))
+        self.lbl_metrics.grid(row=2, column=0, columnspan=2, sticky="w", pady=(2,0))
 
         # Drag anywhere on the bubble
         self._drag = {"x":0, "y":0}
@@ -1011,7 +3812,7 @@ class App:
         def do_drag(e):
             nx, ny = e.x_root - self._drag["x"], e.y_root - self._drag["y"]
             w.geometry(f"+{int(nx)}+{int(ny)}")
-        for widget in (w, frm, self.lbl_status, self.lbl_profile, self.btn_startstop):
+        for widget in (w, frm, self.lbl_status, self.lbl_profile, self.lbl_metrics, self.btn_startstop):
             widget.bind("<Button-1>", start_drag)
             widget.bind("<B1-Motion>", do_drag)
 
@@ -1019,31 +3820,34 @@ class App:
         self.root.update_idletasks()
         w.geometry(f"+{self.root.winfo_screenwidth()-240}+40")
 
-        self._bubble_update()
+        if not self._bubble_subscribed:
+            self._bubble_subscribed = True
+            self.status.subscribe(self._render_bubble)
+        else:
+            self._render_bubble(dict(self.status.state), set(self.status.state))
 
-    def update_bubble_button_color(self):
+    def _render_bubble(self, state: dict, changed: set):
+        """Status-store subscriber: touches only the widgets whose inputs changed."""
         if not (self.win_bubble and self.win_bubble.winfo_exists()):
             return
-        # Priority: running (red) > dry run (yellow) > idle/paused (green)
-        if self.running:
-            bg = "#dc3545"; fg = "white"   # red
-        elif self.dryrun_active:
-            bg = "#ffc107"; fg = "black"   # yellow
-        else:
-            bg = "#28a745"; fg = "white"   # green
-        try:
-            self.btn_startstop.configure(bg=bg, fg=fg, activebackground=bg)
-        except Exception:
-            pass
-
-    def _bubble_update(self):
-        if self.win_bubble and self.win_bubble.winfo_exists():
-            mode="PAUSED" if self.paused else ("RUNNING" if self.running else ("Dry Run" if self.dryrun_active else "Idle"))
+        if changed & {"running", "paused", "dryrun"}:
+            mode="PAUSED" if state["paused"] else ("RUNNING" if state["running"] else ("Dry Run" if state["dryrun"] else "Idle"))
             self.lbl_status.config(text=mode)
-            prof = self.s.current_meta.name or "(none)"
-            self.lbl_profile.config(text=f"Loaded: {ellipsis(prof)}")
-            self.update_bubble_button_color()
-        self.root.after(250, self._bubble_update)
+            # Priority: running (red) > dry run (yellow) > idle/paused (green)
+            if state["running"]:
+                bg = "#dc3545"; fg = "white"   # red
+            elif state["dryrun"]:
+                bg = "#ffc107"; fg = "black"   # yellow
+            else:
+                bg = "#28a745"; fg = "white"   # green
+            try:
+                self.btn_startstop.configure(bg=bg, fg=fg, activebackground=bg)
+            except Exception:
+                pass
+        if "profile" in changed:
+            self.lbl_profile.config(text=f"Loaded: {ellipsis(state['profile'] or '(none)')}")
+        if changed & {"counters", "running"}:
+            self.lbl_metrics.config(text=self.metrics.short_text() if self.metrics else "")
 
     # ----- utils -----
     def tip(self, t): print(f"[TIP] {t}")
@@ -1055,21 +3859,190 @@ class App:
         try:
             if self.tray_icon: self.tray_icon.stop()
         except Exception: pass
-        try:
-            self.stop_event.set()
-            if self.click_thread and self.click_thread.is_alive():
-                self.click_thread.join(timeout=1.5)
-        except Exception: pass
-        try:
-            if self.rec_mouse_listener: self.rec_mouse_listener.stop()
-        except Exception: pass
-        try:
-            if self.rec_kb_listener: self.rec_kb_listener.stop()
+        try: self.stop_worker()
         except Exception: pass
+        self._stop_rec_listeners()
+        if self.seq_search: self.seq_search.stop()
+        if self.seq_watch: self.seq_watch.stop()
+        if self.engine_proc: self.engine_proc.close()
+        if not self.writer.close():
+            self.tip("Some settings/sequence writes did not finish before exit.")
         self.root.quit()
 
+# ---------- CLI ----------
+# `pyautoclicker.py run|validate|stats|convert|optimize FILE` runs, inspects or rewrites saved
+# sequences without Tk, tray or hotkeys; pack/unpack/convert-all work on whole folders. Settings
+# come from the app's INI (read-only) so a scripted run clicks like the GUI would.
+CLI_COMMANDS = ("run", "validate", "stats", "convert", "optimize", "pack", "unpack", "convert-all")
+
+def _cli_parser():
+    import argparse
+    ap = argparse.ArgumentParser(prog="pyautoclicker", description=f"{APP_NAME} {APP_VERSION} headless runner")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="play saved sequences (streamed from disk) and/or a generated grid")
+    r.add_argument("files", nargs="*", metavar="file", help="two or more sources run interleaved on one timing thread")
+    r.add_argument("--grid", metavar="X0,Y0,X1,Y1,COLS,ROWS[,DELAY_MS]", help="add a generated grid sweep")
+    r.add_argument("--repeats", type=int, help="passes to run (0 = until Ctrl+C); default from the file")
+    r.add_argument("--speed", type=float, help="playback speed factor, e.g. 0.5 or 4 (max_cps still applies); default from the INI")
+    r.add_argument("--idle-cap-ms", type=int, help="shorten recorded gaps longer than this before scaling (0 = off); default from the INI")
+    r.add_argument("--seed", type=int, help="humanization seed for a reproducible run")
+    r.add_argument("--max-cps", type=int, help="override the max_cps setting")
+    r.add_argument("--backend", choices=("pynput", "fake"), default="pynput", help="fake records clicks instead of sending them")
+    r.add_argument("--ini", default=INI_PATH, help="settings file (read-only)")
+    r.add_argument("--json", action="store_true", help="print the run metrics as JSON")
+    v = sub.add_parser("validate", help="check sequence files (or every file in a folder) for structural problems")
+    v.add_argument("files", nargs="+", help="files and/or folders")
+    v.add_argument("--jobs", type=int, help="worker processes for large batches (default: CPU count; 1 = inline)")
+    v.add_argument("-q", "--quiet", action="store_true", help="only list files with problems")
+    st = sub.add_parser("stats", help="summarize sequence files")
+    st.add_argument("files", nargs="+")
+    st.add_argument("--max-cps", type=int, default=Settings.max_cps, help="floor applied to delays (default %(default)s)")
+    st.add_argument("--json", action="store_true")
+    c = sub.add_parser("convert", help="convert between .json and .pacseq (by extension)")
+    c.add_argument("src"); c.add_argument("dst")
+    o = sub.add_parser("optimize", help="drop duplicate steps and/or reorder click runs to cut cursor travel")
+    o.add_argument("src"); o.add_argument("dst", nargs="?", help="write the result here (format by extension); omit for a report only")
+    o.add_argument("--tolerance", type=int, default=0, metavar="PX", help="drop a step this close to the previous same-button step (default 0 = exact repeats)")
+    o.add_argument("--no-dedupe", action="store_true")
+    o.add_argument("--reorder", action="store_true", help="re-tour each run of consecutive same-button clicks (their order must not matter)")
+    o.add_argument("--budget", type=float, default=OPTIMIZE_BUDGET_S, help="seconds of 2-opt improvement (default %(default)s)")
+    o.add_argument("--max-cps", type=int, default=Settings.max_cps, help="floor used for the runtime estimate (default %(default)s)")
+    o.add_argument("--json", action="store_true")
+    pk = sub.add_parser("pack", help="pack a sequences folder into one .zip (invalid files are left out)")
+    pk.add_argument("folder"); pk.add_argument("archive")
+    up = sub.add_parser("unpack", help="unpack a .zip library into a folder (taken names get ' (2)', ...)")
+    up.add_argument("archive"); up.add_argument("folder")
+    ca = sub.add_parser("convert-all", help="write every file of a folder in another format (sources are kept)")
+    ca.add_argument("folder"); ca.add_argument("--to", choices=SEQUENCE_FORMATS, required=True)
+    ca.add_argument("--out", help="destination folder (default: the same folder)")
+    for p_ in (pk, up, ca):
+        p_.add_argument("--jobs", type=int, help="worker processes (default: CPU count; 1 = inline)")
+        p_.add_argument("--json", action="store_true")
+    return ap
+
+def _cli_run(a) -> int:
+    s, _ = read_settings(a.ini)
+    if a.seed is not None: s.humanize_seed = a.seed
+    if a.max_cps is not None: s.max_cps = a.max_cps
+    s.clamp()
+    runs = []
+    for path in a.files:
+        try: runs.append((path, read_sequence_meta(path), FileSteps(path)))
+        except (ValueError, TypeError, OSError) as e:   # TypeError: unknown meta keys
+            print(f"{path}: {e}", file=sys.stderr); return 1
+    if a.grid:
+        try: g = [int(v) for v in a.grid.split(",")]
+        except ValueError: g = []
+        if len(g) not in (6, 7):
+            print("run: --grid needs X0,Y0,X1,Y1,COLS,ROWS[,DELAY_MS]", file=sys.stderr); return 2
+        runs.append(("grid", SequenceMeta(name="grid", repeats=1), GridSweep(*g)))
+    if not runs: raise SystemExit("run: give at least one file or --grid")
+    for i, (path, meta, steps) in enumerate(runs):
+        if a.repeats is not None: meta.repeats = max(0, a.repeats)
+        runs[i] = (meta.name or os.path.basename(path), meta, steps)
+    backend = FakeBackend() if a.backend == "fake" else PynputBackend()
+    if len(runs) > 1:
+        eng = MultiEngine(s, backend, speed=a.speed, idle_cap_ms=a.idle_cap_ms)
+        for name, meta, steps in runs: eng.add(name, steps, meta)
+        args = ()
+    else:
+        eng = ClickEngine(s, backend, speed=a.speed, idle_cap_ms=a.idle_cap_ms)
+        args = (runs[0][2], runs[0][1])
+    failed = []
+    def work():
+        try: eng.run(*args)
+        except Exception as e:   # e.g. a malformed step reached while streaming
+            failed.append(e); eng.control.stop()
+    t = threading.Thread(target=work, daemon=True)
+    t.start()
+    try:
+        while t.is_alive(): t.join(0.2)
+    except KeyboardInterrupt:
+        eng.control.stop(); t.join(1.0)
+    if failed:
+        print(f"run: {failed[0]}", file=sys.stderr); return 1
+    m = eng.metrics
+    if a.json: print(json.dumps(m.snapshot()))
+    else: print(f"{m.short_text()} in {m.active_secs():.2f}s; {eng.scheduler.summary()}")
+    if not a.json and len(runs) > 1:
+        for tr in eng.tracks: print(f"  {tr.name}: {tr.clicks} clicks, {tr.passes} passes")
+    return 0
+
+def _cli_validate(a) -> int:
+    paths = [f for p in a.files for f in (library_files(p) if os.path.isdir(p) else [p])]
+    t0 = time.perf_counter()
+    res = []
+    for path, errs, _ in _pool_imap(_lib_validate, paths, a.jobs):
+        res.append((path, errs))
+        if errs or not a.quiet: print(f"{path}: {'OK' if not errs else f'{len(errs)} problem(s)'}")
+        for e in errs: print(f"  {e}")
+    r = _library_report("validate", t0, res)
+    if len(paths) > 1: print(library_report_text(r, limit=0).splitlines()[0])
+    return 1 if r["failed"] else 0
+
+def _cli_library(a) -> int:
+    try:
+        if a.cmd == "pack": r = pack_library(a.folder, a.archive, a.jobs)
+        elif a.cmd == "unpack":
+            os.makedirs(a.folder, exist_ok=True); r = unpack_library(a.archive, a.folder, a.jobs)
+        else:
+            if a.out: os.makedirs(a.out, exist_ok=True)
+            r = convert_library(a.folder, a.to, a.out, a.jobs)
+    except Exception as e:
+        print(f"{a.cmd}: {e}", file=sys.stderr); return 1
+    print(json.dumps(r, indent=2) if a.json else library_report_text(r))
+    return 1 if r["failed"] else 0
+
+def _cli_stats(a) -> int:
+    out, rc = {}, 0
+    for path in a.files:
+        try:
+            meta, steps = open_sequence(path)
+        except Exception as e:
+            print(f"{path}: {e}", file=sys.stderr); rc = 1; continue
+        try: out[path] = sequence_stats(meta, steps, a.max_cps)
+        finally: close_steps(steps)
+    if a.json:
+        print(json.dumps(out, indent=2))
+    else:
+        for path, d in out.items():
+            print(f"{path}: {d['name'] or '(unnamed)'} — {d['steps']} steps, pass {d['pass_s']}s, "
+                  f"repeats {d['repeats'] or '∞'}, total {d['total_s'] if d['total_s'] is not None else '∞'}s")
+            if d["steps"]:
+                print(f"  buttons {d['buttons']}  bounds {d['bounds']}  delay_ms {d['delay_ms']}")
+    return rc
+
+def _cli_convert(a) -> int:
+    try:
+        n = convert_sequence(a.src, a.dst)
+    except Exception as e:
+        print(f"{a.src}: {e}", file=sys.stderr); return 1
+    print(f"{a.src} -> {a.dst}: {n} steps, {os.path.getsize(a.dst)} bytes")
+    return 0
+
+def _cli_optimize(a) -> int:
+    try:
+        meta, steps = load_sequence_file(a.src)
+        out, r = optimize_sequence(steps, None if a.no_dedupe else a.tolerance, a.reorder, a.budget, meta, a.max_cps)
+        if a.dst: save_sequence_file(a.dst, meta, out)
+    except Exception as e:
+        print(f"{a.src}: {e}", file=sys.stderr); return 1
+    if a.json: print(json.dumps(r))
+    else: print(f"{a.src}" + (f" -> {a.dst}" if a.dst else " (report only)") + "\n  " + optimize_report_text(r).replace("\n", "\n  "))
+    return 0
+
+def cli(argv: List[str]) -> int:
+    a = _cli_parser().parse_args(argv)
+    return {"run": _cli_run, "validate": _cli_validate, "stats": _cli_stats, "convert": _cli_convert,
+            "optimize": _cli_optimize, "pack": _cli_library, "unpack": _cli_library,
+            "convert-all": _cli_library}[a.cmd](a)
+
 # ---- main ----
 def main():
+    if getattr(sys, "frozen", False):   # packaged exe: let the engine process start up
+        import multiprocessing; multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(cli(sys.argv[1:]))
     root = tk.Tk()
     app = App(root)
     if not app.s.start_minimized: